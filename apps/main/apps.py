@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class MainConfig(AppConfig):
     name = "apps.main"
+
+    def ready(self):
+        from apps.main import checks, signals  # noqa: F401
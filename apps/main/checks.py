@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+# attempt жоспары, answered белгілері, answer key мен blueprint процестер арасында ортақ болуы керек
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    if backend in PROCESS_LOCAL_CACHES and not settings.DEBUG:
+        return [
+            Error(
+                f"{backend} is local to one process; gunicorn workers would see different answered flags "
+                "and stale answer keys.",
+                hint="Use DatabaseCache or RedisCache (CACHE_BACKEND), or run with DEBUG=True.",
+                id="main.E001",
+            )
+        ]
+    return []
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.main.services.attempt import MCQ_TYPES, sync_mcq_selections
+from core.models.attempts import MCQSelection, QuestionAttempt
+
+
+class Command(BaseCommand):
+    help = "MCQ жауаптарының answer_json мен MCQSelection кестесі арасындағы сәйкестігін тексеру."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--exam", type=int, help="Емтихан ID")
+        parser.add_argument("--fix", action="store_true", help="MCQSelection-ды answer_json бойынша түзету")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--show", type=int, default=20, help="Қанша сәйкессіздікті шығару")
+
+    def handle(self, *args, **opts):
+        batch_size = max(1, opts["batch_size"])
+
+        qs = QuestionAttempt.objects.filter(question__question_type__in=MCQ_TYPES)
+        if opts["exam"]:
+            qs = qs.filter(section_attempt__attempt__exam_id=opts["exam"])
+        rows = qs.order_by("pk").values_list("pk", "answer_json").iterator(chunk_size=batch_size)
+
+        checked = 0
+        mismatched = 0
+        batch: dict[int, list[int]] = {}
+
+        for qa_id, answer_json in rows:
+            batch[qa_id] = [int(oid) for oid in (answer_json or {}).get("selected_option_ids", [])]
+            if len(batch) >= batch_size:
+                checked += len(batch)
+                mismatched += self._check(batch, opts)
+                batch = {}
+
+        if batch:
+            checked += len(batch)
+            mismatched += self._check(batch, opts)
+
+        style = self.style.SUCCESS if not mismatched else self.style.WARNING
+        action = "түзетілді" if opts["fix"] else "табылды"
+        self.stdout.write(style(f"{checked} жауап тексерілді, {mismatched} сәйкессіздік {action}."))
+
+    def _check(self, batch: dict[int, list[int]], opts) -> int:
+        stored: dict[int, set[int]] = {}
+        for qa_id, opt_id in (
+            MCQSelection.objects
+            .filter(question_attempt_id__in=batch.keys())
+            .values_list("question_attempt_id", "option_id")
+        ):
+            stored.setdefault(qa_id, set()).add(opt_id)
+
+        bad = {qa_id: ids for qa_id, ids in batch.items() if set(ids) != stored.get(qa_id, set())}
+        for qa_id in list(bad)[:max(0, opts["show"])]:
+            opts["show"] -= 1
+            self.stdout.write(
+                f"  qa #{qa_id}: answer_json={sorted(bad[qa_id])} MCQSelection={sorted(stored.get(qa_id, set()))}"
+            )
+
+        if bad and opts["fix"]:
+            with transaction.atomic():
+                sync_mcq_selections(bad)
+        return len(bad)
@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.utils.module_loading import import_string
+from apps.main.services.grading import claim_grading_jobs, run_grading_job, get_transcriber
+from apps.main.services.sandbox import get_pool, pool_size, purge_compile_cache
+
+
+COMPILE_CACHE_PURGE_INTERVAL = 60 * 10
+
+
+class Command(BaseCommand):
+    help = "Айтылым және жазылым жауаптарын фондық режимде бағалау (DB кезегі)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=settings.GRADING_WORKER_THREADS)
+        parser.add_argument("--max-attempts", type=int, default=settings.GRADING_MAX_ATTEMPTS)
+        parser.add_argument("--poll-interval", type=float, default=2.0)
+        parser.add_argument("--transcriber", default=None, help="Dotted path, мысалы apps.main.services.speaking.stub_transcribe_audio")
+        parser.add_argument("--once", action="store_true", help="Кезекті бір рет өңдеп, шығу.")
+
+    def handle(self, *args, **opts):
+        threads = max(1, opts["threads"])
+        transcribe = import_string(opts["transcriber"]) if opts["transcriber"] else get_transcriber()
+        max_attempts = opts["max_attempts"]
+
+        def work(job_id):
+            try:
+                return run_grading_job(job_id, transcribe=transcribe, max_attempts=max_attempts)
+            finally:
+                connection.close()
+
+        get_pool()
+        last_purge = time.monotonic() - COMPILE_CACHE_PURGE_INTERVAL
+        self.stdout.write(f"grading worker: {threads} thread(s), {pool_size()} sandbox process(es)")
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            while True:
+                close_old_connections()
+                job_ids = claim_grading_jobs(limit=threads * 2)
+
+                if job_ids:
+                    for job_id, status in zip(job_ids, pool.map(work, job_ids)):
+                        self.stdout.write(f"job #{job_id}: {status}")
+                    continue
+
+                if time.monotonic() - last_purge >= COMPILE_CACHE_PURGE_INTERVAL:
+                    last_purge = time.monotonic()
+                    purged = purge_compile_cache(
+                        settings.SANDBOX_CACHE_DIR, settings.SANDBOX_COMPILE_CACHE_HOURS,
+                        settings.SANDBOX_COMPILE_CACHE_MB,
+                    )
+                    if purged:
+                        self.stdout.write(f"{purged} compiled program(s) removed from cache")
+
+                if opts["once"]:
+                    break
+                time.sleep(opts["poll_interval"])
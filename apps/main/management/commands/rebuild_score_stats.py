@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.main.services.stats import STATS_CHUNK_SIZE, rebuild_score_stats
+
+
+class Command(BaseCommand):
+    help = "Емтихан/пайдаланушы/күн статистика кестелерін аяқталған нәтижелерден қайта құру."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=STATS_CHUNK_SIZE)
+
+    def handle(self, *args, **opts):
+        total = rebuild_score_stats(chunk_size=max(1, opts["batch_size"]))
+        self.stdout.write(self.style.SUCCESS(f"{total} нәтиже бойынша статистика қайта құрылды."))
@@ -0,0 +1,92 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.main.services.attempt import recalc_attempts_scores
+from apps.main.services.speaking import match_rubric_keywords, score_speaking
+from core.models import SpeakingRubric
+from core.models.attempts import QuestionAttempt, SpeakingAnswer
+
+
+class Command(BaseCommand):
+    help = "Рубрика өзгергеннен кейін айтылым жауаптарын сақталған транскрипт бойынша қайта бағалау."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--exam", type=int, help="Емтихан ID")
+        parser.add_argument("--question", type=int, action="append", help="Сұрақ ID (бірнеше рет беруге болады)")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        if not opts["exam"] and not opts["question"]:
+            raise CommandError("--exam немесе --question көрсетіңіз.")
+
+        batch_size = max(1, opts["batch_size"])
+
+        rubric_qs = SpeakingRubric.objects.all()
+        if opts["exam"]:
+            rubric_qs = rubric_qs.filter(question__section__exam_id=opts["exam"])
+        if opts["question"]:
+            rubric_qs = rubric_qs.filter(question_id__in=opts["question"])
+        rubrics = {r.question_id: r for r in rubric_qs}
+        if not rubrics:
+            self.stdout.write("Рубрика табылмады.")
+            return
+
+        rows = (
+            SpeakingAnswer.objects
+            .filter(question_attempt__question_id__in=rubrics.keys())
+            .exclude(transcript__isnull=True)
+            .exclude(transcript="")
+            .order_by("pk")
+            .values_list(
+                "pk", "question_attempt_id", "question_attempt__question_id",
+                "question_attempt__section_attempt__attempt_id", "transcript",
+            )
+            .iterator(chunk_size=batch_size)
+        )
+
+        started = time.monotonic()
+        processed = 0
+        attempt_ids = set()
+        sa_batch, qa_batch = [], []
+
+        for sa_id, qa_id, question_id, attempt_id, transcript in rows:
+            rubric = rubrics[question_id]
+            matched = match_rubric_keywords(transcript, rubric)
+            points = score_speaking(matched, rubric.point_per_keyword, rubric.max_points)
+
+            sa_batch.append(SpeakingAnswer(pk=sa_id, matched_keywords=matched, matched_count=len(matched)))
+            qa_batch.append(QuestionAttempt(
+                pk=qa_id,
+                score=points,
+                max_score=rubric.max_points,
+                is_graded=True,
+                answer_json={
+                    "type": "speaking_keywords",
+                    "transcript": transcript,
+                    "matched_keywords": matched,
+                },
+            ))
+            attempt_ids.add(attempt_id)
+
+            if len(sa_batch) >= batch_size:
+                processed += self._flush(sa_batch, qa_batch)
+
+        processed += self._flush(sa_batch, qa_batch)
+
+        recalc_attempts_scores(attempt_ids)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f"{processed} жауап, {len(attempt_ids)} attempt қайта бағаланды: "
+            f"{elapsed:.2f} сек, {processed / elapsed:.0f} жауап/сек"
+        ))
+
+    @staticmethod
+    def _flush(sa_batch, qa_batch) -> int:
+        if not sa_batch:
+            return 0
+        n = len(sa_batch)
+        SpeakingAnswer.objects.bulk_update(sa_batch, ["matched_keywords", "matched_count"])
+        QuestionAttempt.objects.bulk_update(qa_batch, ["score", "max_score", "is_graded", "answer_json"])
+        sa_batch.clear()
+        qa_batch.clear()
+        return n
@@ -0,0 +1,43 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from apps.main.services.sandbox import LANGUAGES, RunStatus, get_pool, is_language_available, pool_size, run_in_pool
+
+
+SAMPLES = {
+    "python": "a, b = map(int, input().split())\nprint(a + b)\n",
+    "js": "const [a, b] = require('fs').readFileSync(0, 'utf8').trim().split(/\\s+/).map(Number);\nconsole.log(a + b);\n",
+    "cpp": "#include <iostream>\nint main() { long long a, b; std::cin >> a >> b; std::cout << a + b << std::endl; }\n",
+    "java": (
+        "import java.util.*;\npublic class Main { public static void main(String[] x) {"
+        " Scanner s = new Scanner(System.in); System.out.println(s.nextLong() + s.nextLong()); } }\n"
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = "Sandbox өткізу қабілетін өлшеу (submission/сек)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--language", choices=sorted(LANGUAGES), default="python")
+        parser.add_argument("-n", "--count", type=int, default=100)
+
+    def handle(self, *args, **opts):
+        language = opts["language"]
+        if not is_language_available(language):
+            raise CommandError(f"{language} runtime табылмады.")
+
+        get_pool()
+        code = SAMPLES[language]
+        count = max(1, opts["count"])
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=pool_size()) as threads:
+            results = list(threads.map(lambda i: run_in_pool(language, code, f"{i} {i}\n"), range(count)))
+        elapsed = max(time.monotonic() - started, 1e-6)
+
+        ok = sum(1 for r in results if r.status == RunStatus.OK)
+        self.stdout.write(self.style.SUCCESS(
+            f"{language}: {count} submission, {ok} ok, {pool_size()} process, "
+            f"{elapsed:.2f} сек, {count / elapsed:.1f} submission/сек"
+        ))
@@ -0,0 +1,25 @@
+from apps.main.services.blueprint import get_exam_cached
+from core.models import Option
+
+
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(exam_id: int) -> str:
+    return f"exam_answer_key:{exam_id}"
+
+
+# build_exam_answer_key: бүкіл емтиханның дұрыс нұсқалары бір сұраныспен
+def build_exam_answer_key(exam_id: int) -> dict[int, frozenset[int]]:
+    correct: dict[int, set[int]] = {}
+    for qid, oid in (
+        Option.objects
+        .filter(question__section__exam_id=exam_id, is_correct=True)
+        .values_list("question_id", "id")
+    ):
+        correct.setdefault(qid, set()).add(oid)
+    return {qid: frozenset(ids) for qid, ids in correct.items()}
+
+
+def get_exam_answer_key(exam_id: int) -> dict[int, frozenset[int]]:
+    return get_exam_cached(exam_id, _cache_key(exam_id), build_exam_answer_key, ANSWER_KEY_CACHE_TIMEOUT)
@@ -1,16 +1,20 @@
 from decimal import Decimal
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Sum
+from django.db.models import F, Sum
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 import random
-from apps.main.services.speaking import score_speaking, match_keywords, transcribe_audio
-from apps.main.services.writing import grade_writing_submission
-from core.models import Question, SpeakingRubric, SectionMaterial
+from apps.main.services.answer_key import get_exam_answer_key
+from apps.main.services.blueprint import get_exam_blueprint
+from apps.main.services.grading import enqueue_grading_jobs
+from apps.main.services.plan import get_answered_q_ids, get_attempt_plan, invalidate_attempt_plan, mark_answered
+from apps.main.services.stats import refresh_attempts_stats
+from core.models import Option, Question, Writing
 from core.models.attempts import (
     ExamAttempt, SectionAttempt, QuestionAttempt,
-    AttemptStatus, MCQSelection, WritingSubmission, SpeakingAnswer,
+    AttemptStatus, MCQSelection, WritingSubmission,
 )
 
 
@@ -22,45 +26,78 @@ def load_attempt_for_user(request, attempt_id: int) -> ExamAttempt:
     )
 
 
+class AttemptNotInProgress(RuntimeError):
+    pass
+
+
+def lock_in_progress_attempt(attempt_id: int) -> None:
+    # жауап жазатын (HTMX, autosave) және аяқтайтын жолдар алдымен attempt жолын құлыптайды:
+    # autosave finish-пен кезектесіп орындалады және аяқталған attempt-ке жауап қоса алмайды
+    status = ExamAttempt.objects.select_for_update().values_list("status", flat=True).get(pk=attempt_id)
+    if status != AttemptStatus.IN_PROGRESS:
+        raise AttemptNotInProgress(f"Attempt {attempt_id} is not in progress.")
+
+
 def is_hx(request):
     return request.headers.get("HX-Request") == "true"
 
 
 # ensure_attempt_initialized
-@transaction.atomic
+ATTEMPT_PLAN_VERSION = 1
+
+
+def is_attempt_initialized(attempt: ExamAttempt) -> bool:
+    meta = attempt.meta or {}
+    return (
+        attempt.status != AttemptStatus.NO_STARTED
+        and meta.get("plan_version") == ATTEMPT_PLAN_VERSION
+    )
+
+
+def _mark_attempt_initialized(attempt: ExamAttempt, max_total: Decimal) -> None:
+    attempt.max_total_score = max_total
+    attempt.meta = {**(attempt.meta or {}), "plan_version": ATTEMPT_PLAN_VERSION}
+    attempt.save(update_fields=["max_total_score", "meta"])
+
+
 def ensure_attempt_initialized(attempt: ExamAttempt) -> None:
-    exam = attempt.exam
+    # сұрақтар жоспары бір рет құрылады, кейінгі сұраныстар DB-ға бармайды
+    if is_attempt_initialized(attempt):
+        return
+    _initialize_attempt(attempt)
+
 
+@transaction.atomic
+def _initialize_attempt(attempt: ExamAttempt) -> None:
     if attempt.status == AttemptStatus.NO_STARTED:
         attempt.status = AttemptStatus.IN_PROGRESS
         if not attempt.started_at:
             attempt.started_at = timezone.now()
         attempt.save(update_fields=["status", "started_at"])
 
-    sections = list(exam.sections.all().order_by("order"))
+    blueprint = get_exam_blueprint(attempt.exam_id)
 
-    existing_sa = {
-        sa.section_id: sa
-        for sa in attempt.section_attempts.select_related("section").all()
-    }
+    existing_sa = {sa.section_id: sa for sa in attempt.section_attempts.all()}
 
     to_create = []
-    for sec in sections:
+    for sec in blueprint.sections:
         if sec.id not in existing_sa:
             to_create.append(
                 SectionAttempt(
                     attempt=attempt,
-                    section=sec,
+                    section_id=sec.id,
                     status=AttemptStatus.NO_STARTED,
                     max_score=Decimal(str(sec.max_score or 0)),
                 )
             )
     if to_create:
-        SectionAttempt.objects.bulk_create(to_create)
+        for sa in SectionAttempt.objects.bulk_create(to_create):
+            existing_sa[sa.section_id] = sa
 
-    existing_sa = {
-        sa.section.section_type: sa
-        for sa in attempt.section_attempts.select_related("section").all()
+    sa_by_type = {
+        sec.section_type: existing_sa[sec.id]
+        for sec in blueprint.sections
+        if sec.id in existing_sa
     }
 
     if QuestionAttempt.objects.filter(section_attempt__attempt=attempt).exists():
@@ -70,59 +107,40 @@ def ensure_attempt_initialized(attempt: ExamAttempt) -> None:
             .aggregate(total=Sum("max_score"))["total"]
             or Decimal("0")
         )
-        if attempt.max_total_score != max_total:
-            attempt.max_total_score = max_total
-            attempt.save(update_fields=["max_total_score"])
+        _mark_attempt_initialized(attempt, max_total)
         return
 
-    reading_sa = existing_sa.get("reading")
-    listening_sa = existing_sa.get("listening")
-    speaking_sa = existing_sa.get("speaking")
-    writing_sa = existing_sa.get("writing")
+    reading_sa = sa_by_type.get("reading")
+    listening_sa = sa_by_type.get("listening")
+    speaking_sa = sa_by_type.get("speaking")
+    writing_sa = sa_by_type.get("writing")
 
     if not all([reading_sa, listening_sa, speaking_sa, writing_sa]):
         return
 
-    reading_mats = list(
-        SectionMaterial.objects.filter(section=reading_sa.section, is_active=True).order_by("order", "id")
-    )
-    listening_mats = list(
-        SectionMaterial.objects.filter(section=listening_sa.section, is_active=True).order_by("order", "id")
-    )
+    reading_mats = blueprint.materials.get(reading_sa.section_id, ())
+    listening_mats = blueprint.materials.get(listening_sa.section_id, ())
     if not reading_mats or not listening_mats:
         return
 
     r_mat = random.choice(reading_mats)
     l_mat = random.choice(listening_mats)
 
-    r_qs = list(
-        Question.objects
-        .filter(section_material=r_mat)
-        .order_by("order", "id")[:10]
-    )
-    l_qs = list(
-        Question.objects
-        .filter(section_material=l_mat)
-        .order_by("order", "id")[:10]
-    )
+    r_qs = blueprint.material_questions.get(r_mat, ())
+    l_qs = blueprint.material_questions.get(l_mat, ())
 
-    speaking_pool = list(
-        Question.objects.filter(section=speaking_sa.section).order_by("order", "id")
-    )
+    speaking_pool = blueprint.speaking_pools.get(speaking_sa.section_id, ())
     if not speaking_pool:
         return
     s_q = random.choice(speaking_pool)
 
-    writing_pool = Question.objects.filter(
-        section=writing_sa.section,
-        question_type=Question.QuestionType.WRITING
-    )
+    writing_pool = blueprint.writing_pools.get(writing_sa.section_id, {})
     # 5–9 баллдық шаблон
     TEMPLATE = [5, 6, 7, 8, 9]
 
     w_qs = []
     for pts in TEMPLATE:
-        candidates = list(writing_pool.filter(points=pts))
+        candidates = writing_pool.get(pts)
         if not candidates:
             return
 
@@ -131,7 +149,7 @@ def ensure_attempt_initialized(attempt: ExamAttempt) -> None:
     qa_to_create: list[QuestionAttempt] = []
     order = 1
 
-    def add(sa: SectionAttempt, qs: list[Question], mat=None):
+    def add(sa: SectionAttempt, qs, mat_id=None):
         nonlocal order
 
         for q in qs:
@@ -141,15 +159,15 @@ def ensure_attempt_initialized(attempt: ExamAttempt) -> None:
                     Question.QuestionType.MCQ_SINGLE,
                     Question.QuestionType.MCQ_MULTI,
             ):
-                opts = list(q.options.values_list("id", flat=True))
+                opts = list(blueprint.option_ids.get(q.id, ()))
                 random.shuffle(opts)
                 option_ids = opts
 
             qa_to_create.append(
                 QuestionAttempt(
                     section_attempt=sa,
-                    question=q,
-                    section_material=mat,
+                    question_id=q.id,
+                    section_material_id=mat_id,
                     order=order,
                     max_score=Decimal(str(q.points or 0)),
                     option_order=option_ids,
@@ -157,57 +175,150 @@ def ensure_attempt_initialized(attempt: ExamAttempt) -> None:
             )
             order += 1
 
-    add(reading_sa, r_qs, mat=r_mat)
-    add(listening_sa, l_qs, mat=l_mat)
-    add(speaking_sa, [s_q], mat=None)
-    add(writing_sa, w_qs, mat=None)
+    add(reading_sa, r_qs, mat_id=r_mat)
+    add(listening_sa, l_qs, mat_id=l_mat)
+    add(speaking_sa, [s_q])
+    add(writing_sa, w_qs)
 
     if qa_to_create:
         QuestionAttempt.objects.bulk_create(qa_to_create)
 
     max_total = sum((qa.max_score or Decimal("0")) for qa in qa_to_create)
-    attempt.max_total_score = max_total
-    attempt.save(update_fields=["max_total_score"])
+    _mark_attempt_initialized(attempt, max_total)
 
 
 # recalc_attempt_scores
+ROLLUP_CHUNK_SIZE = 500
+
+
 def recalc_attempt_scores(attempt: ExamAttempt) -> None:
-    for sa in attempt.section_attempts.all():
-        agg = sa.question_attempts.aggregate(
-            total=Sum("score"),
-            max_total=Sum("max_score"),
+    recalc_attempts_scores([attempt.pk], loaded={attempt.pk: attempt})
+
+
+def recalc_attempts_scores(attempt_ids, loaded: dict[int, ExamAttempt] | None = None) -> None:
+    attempt_ids = list(dict.fromkeys(attempt_ids))
+    for i in range(0, len(attempt_ids), ROLLUP_CHUNK_SIZE):
+        _rollup_chunk(attempt_ids[i:i + ROLLUP_CHUNK_SIZE], loaded or {})
+
+
+@transaction.atomic
+def _rollup_chunk(attempt_ids: list[int], loaded: dict[int, ExamAttempt]) -> None:
+    # attempt жолдары алдымен құлыпталады: параллель rollup (worker / finish) аяқталғанша күтеді,
+    # сондықтан қосындылар commit болған ұпайлардан оқылады және ескі total үстінен жазылмайды
+    locked = list(
+        ExamAttempt.objects
+        .select_for_update()
+        .filter(pk__in=attempt_ids)
+        .order_by("pk")
+        .only("id", "total_score", "max_total_score")
+    )
+
+    sums = {
+        row["section_attempt_id"]: (row["total"] or Decimal("0"), row["max_total"] or Decimal("0"))
+        for row in (
+            QuestionAttempt.objects
+            .filter(section_attempt__attempt_id__in=attempt_ids)
+            .values("section_attempt_id")
+            .annotate(total=Sum("score"), max_total=Sum("max_score"))
+            .order_by()
         )
-        s = agg["total"] or Decimal("0")
-        ms = agg["max_total"] or Decimal("0")
+    }
 
-        updates = []
-        if sa.score != s:
+    attempt_totals = {aid: [Decimal("0"), Decimal("0")] for aid in attempt_ids}
+    sa_changed = []
+    for sa in (
+        SectionAttempt.objects
+        .filter(attempt_id__in=attempt_ids)
+        .only("id", "attempt_id", "score", "max_score")
+    ):
+        s, ms = sums.get(sa.pk, (Decimal("0"), Decimal("0")))
+        if sa.score != s or sa.max_score != ms:
             sa.score = s
-            updates.append("score")
-        if sa.max_score != ms:
             sa.max_score = ms
-            updates.append("max_score")
-        if updates:
-            sa.save(update_fields=updates)
+            sa_changed.append(sa)
+        attempt_totals[sa.attempt_id][0] += s
+        attempt_totals[sa.attempt_id][1] += ms
+
+    if sa_changed:
+        SectionAttempt.objects.bulk_update(sa_changed, ["score", "max_score"], batch_size=ROLLUP_CHUNK_SIZE)
+
+    a_changed = []
+    for attempt in locked:
+        total, max_total = attempt_totals[attempt.pk]
+        if attempt.pk in loaded:
+            loaded[attempt.pk].total_score = total
+            loaded[attempt.pk].max_total_score = max_total
+        if attempt.total_score != total or attempt.max_total_score != max_total:
+            attempt.total_score = total
+            attempt.max_total_score = max_total
+            a_changed.append(attempt)
+
+    if a_changed:
+        ExamAttempt.objects.bulk_update(a_changed, ["total_score", "max_total_score"], batch_size=ROLLUP_CHUNK_SIZE)
+
+    # сұрақ деңгейіндегі нәтиже (транскрипт, тест жағдайлары) жалпы балл өзгермесе де жаңаруы мүмкін,
+    # сондықтан review кэшінің нұсқасы әр қайта есептеуде өседі
+    ExamAttempt.objects.filter(pk__in=attempt_ids).update(graded_version=F("graded_version") + 1)
+    for attempt in loaded.values():
+        if attempt.pk in attempt_totals:
+            attempt.graded_version += 1
+
+    # аяқталған attempt-тің балы өзгерсе, статистика кестелеріне айырмасы қосылады
+    refresh_attempts_stats(attempt_ids)
+
 
-    agg2 = attempt.section_attempts.aggregate(total=Sum("score"), max_total=Sum("max_score"))
-    total = agg2["total"] or Decimal("0")
-    max_total = agg2["max_total"] or Decimal("0")
+# MCQ жауаптарын оқу: әдепкіде answer_json (MCQSelection join-сыз), қажет болса кестеден
+def selected_option_ids(qa: QuestionAttempt) -> set[int]:
+    return {int(oid) for oid in (qa.answer_json or {}).get("selected_option_ids", [])}
 
-    updates = []
-    if attempt.total_score != total:
-        attempt.total_score = total
-        updates.append("total_score")
-    if attempt.max_total_score != max_total:
-        attempt.max_total_score = max_total
-        updates.append("max_total_score")
-    if updates:
-        attempt.save(update_fields=updates)
+
+def load_mcq_selections(qas) -> dict[int, set[int]]:
+    if settings.MCQ_ANSWER_SOURCE == "answer_json":
+        return {qa.pk: selected_option_ids(qa) for qa in qas}
+
+    selected: dict[int, set[int]] = {}
+    for qa_id, opt_id in (
+        MCQSelection.objects
+        .filter(question_attempt_id__in=[qa.pk for qa in qas])
+        .values_list("question_attempt_id", "option_id")
+    ):
+        selected.setdefault(qa_id, set()).add(opt_id)
+    return selected
 
 
 # save_mcq_answer_only
+def sync_mcq_selections(wanted: dict[int, list[int]]) -> set[int]:
+    # сақталған мен жіберілген жиынның айырмасы ғана жазылады; өзгерген qa_id-лерді қайтарады
+    stored: dict[int, dict[int, int]] = {qa_id: {} for qa_id in wanted}
+    for sel_id, qa_id, oid in (
+        MCQSelection.objects
+        .filter(question_attempt_id__in=wanted.keys())
+        .values_list("id", "question_attempt_id", "option_id")
+    ):
+        stored[qa_id][oid] = sel_id
+
+    to_delete: list[int] = []
+    to_create: list[MCQSelection] = []
+    changed: set[int] = set()
+    for qa_id, option_ids in wanted.items():
+        current = stored[qa_id]
+        target = set(option_ids)
+        removed = [sel_id for oid, sel_id in current.items() if oid not in target]
+        added = [oid for oid in target if oid not in current]
+        if removed or added:
+            changed.add(qa_id)
+        to_delete += removed
+        to_create += [MCQSelection(question_attempt_id=qa_id, option_id=oid) for oid in added]
+
+    if to_delete:
+        MCQSelection.objects.filter(pk__in=to_delete).delete()
+    if to_create:
+        MCQSelection.objects.bulk_create(to_create, ignore_conflicts=True)
+    return changed
+
+
 @transaction.atomic
-def save_mcq_answer_only(qa: QuestionAttempt, selected_ids: list[int]) -> None:
+def save_mcq_answer_only(qa: QuestionAttempt, selected_ids: list[int], seq: int | None = None) -> None:
     q = qa.question
     if q.question_type not in (q.QuestionType.MCQ_SINGLE, q.QuestionType.MCQ_MULTI):
         raise ValidationError("save_mcq_answer_only can be used only for MCQ questions.")
@@ -217,56 +328,141 @@ def save_mcq_answer_only(qa: QuestionAttempt, selected_ids: list[int]) -> None:
         if not set(selected_ids).issubset(allowed_ids):
             raise ValidationError("One or more selected options do not belong to this question.")
 
-    MCQSelection.objects.filter(question_attempt=qa).delete()
+    lock_in_progress_attempt(qa.section_attempt.attempt_id)
+    qa.refresh_from_db(fields=["is_answered", "answer_json", "max_score"])
+
+    # seq autosave-пен ортақ: HTMX жауабы өз seq-ін әкеледі, болмаса сақталғаны қалады,
+    # сондықтан одан бұрын жіберілген autosave batch бұл жауаптың үстінен жазбайды
+    stored_seq = (qa.answer_json or {}).get("seq")
+    if seq is not None and stored_seq is not None and stored_seq >= seq:
+        return
+    if seq is None:
+        seq = stored_seq
+
+    selected_ids = list(dict.fromkeys(selected_ids))
+    changed = sync_mcq_selections({qa.pk: selected_ids})
+
+    # "Келесі" өзгеріссіз басылса — ешнәрсе жазылмайды
+    stored_ids = (qa.answer_json or {}).get("selected_option_ids", [])
+    if (
+        not changed and qa.is_answered == bool(selected_ids) and stored_ids == selected_ids
+        and stored_seq == seq and qa.max_score
+    ):
+        return
+
+    answer_json = {"seq": seq} if seq is not None else {}
     if selected_ids:
-        MCQSelection.objects.bulk_create(
-            [MCQSelection(question_attempt=qa, option_id=oid) for oid in selected_ids]
-        )
         qa.is_answered = True
-        qa.answer_json = {"selected_option_ids": selected_ids}
+        qa.answer_json = {"selected_option_ids": selected_ids, **answer_json}
     else:
         qa.is_answered = False
-        qa.answer_json = {}
+        qa.answer_json = answer_json
 
     qa.is_graded = False
     if not qa.max_score:
         qa.max_score = Decimal(str(q.points or 0))
 
     qa.save(update_fields=["is_answered", "answer_json", "is_graded", "max_score", "updated_at"])
+    mark_answered(qa.section_attempt.attempt_id)
+
+
+# apply_mcq_autosave
+AUTOSAVE_MAX_BATCH = 200
+MCQ_TYPES = (Question.QuestionType.MCQ_SINGLE, Question.QuestionType.MCQ_MULTI)
 
 
-# grade_attempt_mcq
 @transaction.atomic
-def grade_attempt_mcq(attempt) -> None:
-    qas = (
+def apply_mcq_autosave(attempt: ExamAttempt, changes: dict[int, list[int]], seq: int) -> int:
+    if len(changes) > AUTOSAVE_MAX_BATCH:
+        raise ValidationError("Autosave batch is too large.")
+
+    if not changes:
+        return 0
+
+    lock_in_progress_attempt(attempt.pk)
+
+    # тексеру attempt-тің өз жолдары бойынша: емтихан кейін өзгерсе де, тапсырушы көрген сұрақтар мен нұсқалар
+    rows = list(
         QuestionAttempt.objects
-        .filter(section_attempt__attempt=attempt, question__question_type__in=["mcq_single", "mcq_multi"])
+        .select_for_update(of=("self",))
+        .filter(section_attempt__attempt=attempt, question_id__in=changes.keys())
         .select_related("question")
-        .prefetch_related("question__options")
+        .only("id", "question", "option_order", "answer_json", "question__question_type")
     )
+    if len(rows) != len(changes) or any(qa.question.question_type not in MCQ_TYPES for qa in rows):
+        raise ValidationError("Question does not belong to this attempt.")
+
+    current_options: dict[int, set[int]] = {}
+    for qid, oid in Option.objects.filter(question_id__in=changes.keys()).values_list("question_id", "id"):
+        current_options.setdefault(qid, set()).add(oid)
+
+    selections: dict[int, list[int]] = {}
+    for qa in rows:
+        ids = list(dict.fromkeys(changes[qa.question_id]))
+        existing = current_options.get(qa.question_id, set())
+        if not set(ids).issubset(set(qa.option_order or ()) | existing):
+            raise ValidationError("One or more selected options do not belong to this question.")
+        if qa.question.question_type == Question.QuestionType.MCQ_SINGLE and len(ids) > 1:
+            raise ValidationError("Single choice question accepts one option.")
+        # attempt басталғаннан кейін өшірілген нұсқа сақталмайды (оны бағалау мүмкін емес)
+        selections[qa.pk] = [oid for oid in ids if oid in existing]
+
+    now = timezone.now()
+    to_update = []
+    for qa in rows:
+        # кеш келген ескі batch жаңа жауаптың үстінен жазбайды
+        if (qa.answer_json or {}).get("seq", -1) >= seq:
+            continue
+        ids = selections[qa.pk]
+        qa.is_answered = bool(ids)
+        qa.answer_json = {"selected_option_ids": ids, "seq": seq} if ids else {"seq": seq}
+        qa.is_graded = False
+        qa.updated_at = now
+        to_update.append(qa)
+
+    if not to_update:
+        return 0
+
+    QuestionAttempt.objects.bulk_update(to_update, ["is_answered", "answer_json", "is_graded", "updated_at"])
+    sync_mcq_selections({qa.pk: selections[qa.pk] for qa in to_update})
+    mark_answered(attempt.pk)
+    return len(to_update)
 
-    selected = {}
-    for qa_id, opt_id in MCQSelection.objects.filter(question_attempt__in=qas).values_list("question_attempt_id", "option_id"):
-        selected.setdefault(qa_id, set()).add(opt_id)
 
-    for qa in qas:
-        q = qa.question
-        chosen_set = selected.get(qa.pk, set())
-        correct_ids = set(q.options.filter(is_correct=True).values_list("id", flat=True))
+# grade_attempt_mcq
+def score_mcq(question_type: str, points: Decimal, chosen: set[int], correct: frozenset[int]) -> Decimal:
+    if question_type == "mcq_single":
+        if len(chosen) == 1 and chosen == correct:
+            return points
+    elif question_type == "mcq_multi":
+        if chosen == correct and len(correct) > 0:
+            return points
+    return Decimal("0")
 
-        score = Decimal("0")
-        points = Decimal(str(q.points or 0))
 
-        if q.question_type == "mcq_single":
-            if len(chosen_set) == 1 and chosen_set == correct_ids:
-                score = points
-        elif q.question_type == "mcq_multi":
-            if chosen_set == correct_ids and len(correct_ids) > 0:
-                score = points
+@transaction.atomic
+def grade_attempt_mcq(attempt) -> None:
+    qas = list(
+        QuestionAttempt.objects
+        .filter(section_attempt__attempt=attempt, question__question_type__in=["mcq_single", "mcq_multi"])
+        .select_related("question")
+    )
 
-        qa.score = score
-        qa.is_graded = True
-        qa.save(update_fields=["score", "is_graded"])
+    if qas:
+        selected = load_mcq_selections(qas)
+        correct = get_exam_answer_key(attempt.exam_id)
+
+        for qa in qas:
+            q = qa.question
+            qa.score = score_mcq(
+                q.question_type,
+                Decimal(str(q.points or 0)),
+                selected.get(qa.pk, set()),
+                correct.get(q.pk, frozenset()),
+            )
+            qa.is_graded = True
+
+        QuestionAttempt.objects.bulk_update(qas, ["score", "is_graded"])
 
     recalc_attempt_scores(attempt)
 
@@ -276,6 +472,10 @@ def grade_attempt_mcq(attempt) -> None:
 def finish_attempt_auto(attempt: ExamAttempt) -> None:
     if attempt.status != AttemptStatus.IN_PROGRESS:
         return
+    try:
+        lock_in_progress_attempt(attempt.pk)
+    except AttemptNotInProgress:
+        return
 
     grade_attempt_mcq(attempt)
 
@@ -294,110 +494,77 @@ def finish_attempt_auto(attempt: ExamAttempt) -> None:
             sa.finished_at = now
         sa.save(update_fields=["status", "started_at", "finished_at"])
 
+    refresh_attempts_stats([attempt.pk])
+
 
 # build_attempt_question_context
-def build_attempt_question_context(attempt, current_qid: int):
-    qa_qs = (
+def _load_plan_question(qa_id: int) -> QuestionAttempt | None:
+    return (
         QuestionAttempt.objects
-        .filter(section_attempt__attempt=attempt)
         .select_related("question", "section_attempt", "section_attempt__section", "section_material")
-        .prefetch_related("question__options")
-        .order_by("order", "id")
+        .filter(pk=qa_id)
+        .first()
     )
 
-    qa_list = list(qa_qs)
-    if not qa_list:
-        return None
 
-    q_ids = [qa.question_id for qa in qa_list]
+def build_attempt_question_context(attempt, current_qid: int):
+    plan = get_attempt_plan(attempt)
+    if not plan:
+        return None
 
-    if current_qid not in q_ids:
-        current_qid = q_ids[0]
+    idx = next((i for i, item in enumerate(plan) if item.question_id == current_qid), 0)
+    qa = _load_plan_question(plan[idx].qa_id)
+    if qa is None:
+        # кэштегі жоспар ескірген — бір рет қайта құрамыз
+        invalidate_attempt_plan(attempt.pk)
+        plan = get_attempt_plan(attempt)
+        if not plan:
+            return None
+        idx = next((i for i, item in enumerate(plan) if item.question_id == current_qid), 0)
+        qa = _load_plan_question(plan[idx].qa_id)
+        if qa is None:
+            return None
 
-    idx = q_ids.index(current_qid)
-    qa = qa_list[idx]
     q = qa.question
-    if qa.option_order:
-        options = list(q.options.filter(id__in=qa.option_order))
-        options.sort(key=lambda o: qa.option_order.index(o.id))
-    else:
+    options = []
+    selected_set = set()
+    if q.question_type in (Question.QuestionType.MCQ_SINGLE, Question.QuestionType.MCQ_MULTI):
         options = list(q.options.all())
-    current_material = qa.section_material
+        if qa.option_order:
+            by_id = {o.id: o for o in options}
+            options = [by_id[oid] for oid in qa.option_order if oid in by_id]
 
-    selected_set = set(
-        MCQSelection.objects
-        .filter(question_attempt=qa)
-        .values_list("option_id", flat=True)
-    )
+        selected_set = load_mcq_selections([qa]).get(qa.pk, set())
 
-    answered_q_ids = {x.question_id for x in qa_list if x.is_answered}
-    prev_q_id = q_ids[idx - 1] if idx > 0 else None
-    next_q_id = q_ids[idx + 1] if idx < len(q_ids) - 1 else None
+    writing = None
+    if q.question_type == Question.QuestionType.WRITING:
+        writing = Writing.objects.filter(question_id=q.id).first()
+
+    prev_q_id = plan[idx - 1].question_id if idx > 0 else None
+    next_q_id = plan[idx + 1].question_id if idx < len(plan) - 1 else None
 
     return {
         "attempt": attempt,
-        "answered_q_ids": answered_q_ids,
+        "answered_q_ids": get_answered_q_ids(attempt, plan),
         "q": q,
         "qa": qa,
         "selected_set": selected_set,
         "current_section": qa.section_attempt.section,
-        "current_material": current_material,
+        "current_material": qa.section_material,
         "prev_q_id": prev_q_id,
         "next_q_id": next_q_id,
         "q_index": idx + 1,
-        "q_total": len(q_ids),
+        "q_total": len(plan),
         "is_last": next_q_id is None,
-        "flat_questions": [x.question for x in qa_list],
-        "ordered_options": options
+        "flat_questions": plan,
+        "ordered_options": options,
+        "writing": writing,
+        "writing_languages": WritingSubmission.Language.choices,
     }
 
 
 # grade_pending_open_questions
 def grade_pending_open_questions(attempt):
-    qa_qs = (
-        QuestionAttempt.objects
-        .filter(section_attempt__attempt=attempt, is_answered=True, is_graded=False)
-        .select_related("question", "section_attempt")
-    )
-
-    for qa in qa_qs:
-        q = qa.question
-
-        if q.question_type == "speaking_keywords":
-            sa = SpeakingAnswer.objects.filter(question_attempt=qa).first()
-            if not sa or not sa.audio:
-                continue
-
-            rubric = SpeakingRubric.objects.filter(question=q).first()
-            if not rubric:
-                continue
-
-            transcript = transcribe_audio(sa.audio.path)
-            matched = match_keywords(transcript, rubric.keywords)
-            points = score_speaking(matched, rubric.point_per_keyword, rubric.max_points)
-
-            sa.transcript = transcript
-            sa.matched_keywords = matched
-            sa.matched_count = len(matched)
-            sa.save(update_fields=["transcript", "matched_keywords", "matched_count"])
-
-            qa.max_score = rubric.max_points
-            qa.score = points
-            qa.is_graded = True
-            qa.answer_json = {
-                "type": "speaking_keywords",
-                "transcript": transcript,
-                "matched_keywords": matched,
-            }
-            qa.save(update_fields=["max_score", "score", "is_graded", "answer_json"])
-
-        elif q.question_type == "writing":
-            sub = WritingSubmission.objects.filter(question_attempt=qa).first()
-            if not sub:
-                continue
-
-            is_correct = grade_writing_submission(sub)
-            qa.score = qa.max_score if is_correct else 0
-            qa.is_graded = True
-            qa.answer_json = {"type": "writing", "correct": bool(is_correct)}
-            qa.save(update_fields=["score", "is_graded", "answer_json"])
+    # айтылым (speech-to-text) мен жазылым (код орындау) фондық worker-ге кезекке қойылады;
+    # worker MCQ ұпайлары commit болғаннан кейін ғана job алады
+    transaction.on_commit(lambda: enqueue_grading_jobs(attempt))
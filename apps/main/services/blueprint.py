@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from core.models import Exam, Section, SectionMaterial, Question, Option
+
+
+BLUEPRINT_CACHE_TIMEOUT = 60 * 10
+MATERIAL_QUESTION_LIMIT = 10
+
+
+@dataclass(frozen=True)
+class SectionSpec:
+    id: int
+    section_type: str
+    max_score: int
+
+
+@dataclass(frozen=True)
+class QuestionSpec:
+    id: int
+    question_type: str
+    points: int
+
+
+# ExamBlueprint: жаңа attempt құруға керек барлық дерек бір снапшотта
+@dataclass(frozen=True)
+class ExamBlueprint:
+    exam_id: int
+    sections: tuple[SectionSpec, ...]
+    materials: dict[int, tuple[int, ...]]
+    material_questions: dict[int, tuple[QuestionSpec, ...]]
+    speaking_pools: dict[int, tuple[QuestionSpec, ...]]
+    writing_pools: dict[int, dict[int, tuple[QuestionSpec, ...]]]
+    option_ids: dict[int, tuple[int, ...]]
+
+
+EXAM_VERSION_CACHE_TIMEOUT = 60 * 10
+
+
+def _cache_key(exam_id: int) -> str:
+    return f"exam_blueprint:{exam_id}"
+
+
+def _version_key(exam_id: int) -> str:
+    return f"exam_content_version:{exam_id}"
+
+
+# exam content version: DB-дағы нұсқа — түпнұсқа, кэште оның көшірмесі тұрады.
+# Кэштегі мән (version, value) түрінде сақталады және нұсқа кілтімен бір get_many арқылы оқылады;
+# нұсқа сәйкес келмесе — снапшот ескірген, қайта құрылады
+def get_exam_content_version(exam_id: int) -> int:
+    return Exam.objects.filter(pk=exam_id).values_list("content_version", flat=True).first() or 0
+
+
+def bump_exam_content_version(exam_id: int | None) -> None:
+    if not exam_id:
+        return
+    Exam.objects.filter(pk=exam_id).update(content_version=F("content_version") + 1)
+    # commit-тен кейін жаңа нұсқа кэшке жазылады; кеш келген оқушының add()-ы оның үстінен түспейді
+    transaction.on_commit(lambda: cache.set(
+        _version_key(exam_id), get_exam_content_version(exam_id), EXAM_VERSION_CACHE_TIMEOUT,
+    ))
+
+
+def get_exam_cached(exam_id: int, key: str, build, timeout: int):
+    version_key = _version_key(exam_id)
+    cached = cache.get_many([version_key, key])
+    version = cached.get(version_key)
+    if version is None:
+        version = get_exam_content_version(exam_id)
+        cache.add(version_key, version, EXAM_VERSION_CACHE_TIMEOUT)
+
+    entry = cached.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    value = build(exam_id)
+    cache.set(key, (version, value), timeout)
+    return value
+
+
+def build_exam_blueprint(exam_id: int) -> ExamBlueprint:
+    sections = tuple(
+        SectionSpec(id=sid, section_type=st, max_score=ms or 0)
+        for sid, st, ms in (
+            Section.objects
+            .filter(exam_id=exam_id)
+            .order_by("order")
+            .values_list("id", "section_type", "max_score")
+        )
+    )
+    section_type_by_id = {s.id: s.section_type for s in sections}
+
+    materials: dict[int, list[int]] = {}
+    for mat_id, section_id in (
+        SectionMaterial.objects
+        .filter(section__exam_id=exam_id, is_active=True)
+        .order_by("order", "id")
+        .values_list("id", "section_id")
+    ):
+        materials.setdefault(section_id, []).append(mat_id)
+
+    material_questions: dict[int, list[QuestionSpec]] = {}
+    speaking_pools: dict[int, list[QuestionSpec]] = {}
+    writing_pools: dict[int, dict[int, list[QuestionSpec]]] = {}
+    mcq_ids = set()
+
+    for qid, qtype, points, section_id, mat_id in (
+        Question.objects
+        .filter(section__exam_id=exam_id)
+        .order_by("order", "id")
+        .values_list("id", "question_type", "points", "section_id", "section_material_id")
+    ):
+        spec = QuestionSpec(id=qid, question_type=qtype, points=points or 0)
+        st = section_type_by_id.get(section_id)
+
+        if mat_id is not None:
+            bucket = material_questions.setdefault(mat_id, [])
+            if len(bucket) < MATERIAL_QUESTION_LIMIT:
+                bucket.append(spec)
+                if qtype in (Question.QuestionType.MCQ_SINGLE, Question.QuestionType.MCQ_MULTI):
+                    mcq_ids.add(qid)
+
+        if st == Section.SectionType.SPEAKING:
+            speaking_pools.setdefault(section_id, []).append(spec)
+        elif st == Section.SectionType.WRITING and qtype == Question.QuestionType.WRITING:
+            writing_pools.setdefault(section_id, {}).setdefault(spec.points, []).append(spec)
+
+    option_ids: dict[int, list[int]] = {}
+    if mcq_ids:
+        for qid, oid in (
+            Option.objects
+            .filter(question_id__in=mcq_ids)
+            .order_by("id")
+            .values_list("question_id", "id")
+        ):
+            option_ids.setdefault(qid, []).append(oid)
+
+    return ExamBlueprint(
+        exam_id=exam_id,
+        sections=sections,
+        materials={k: tuple(v) for k, v in materials.items()},
+        material_questions={k: tuple(v) for k, v in material_questions.items()},
+        speaking_pools={k: tuple(v) for k, v in speaking_pools.items()},
+        writing_pools={
+            sid: {pts: tuple(v) for pts, v in buckets.items()}
+            for sid, buckets in writing_pools.items()
+        },
+        option_ids={k: tuple(v) for k, v in option_ids.items()},
+    )
+
+
+def get_exam_blueprint(exam_id: int) -> ExamBlueprint:
+    return get_exam_cached(exam_id, _cache_key(exam_id), build_exam_blueprint, BLUEPRINT_CACHE_TIMEOUT)
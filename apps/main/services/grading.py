@@ -0,0 +1,218 @@
+import hashlib
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from apps.main.services.speaking import score_speaking, match_rubric_keywords, transcribe_audio, TRANSCRIBE_MODEL
+from core.models import SpeakingRubric
+from apps.main.services.writing import grade_writing_submission
+from core.models.attempts import QuestionAttempt, SpeakingAnswer, SpeakingTranscript, WritingSubmission
+from core.models.jobs import GradingJob, JobStatus
+
+
+RETRY_BACKOFF_SECONDS = 15
+STALE_LOCK_SECONDS = 60 * 10
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def get_transcriber():
+    return import_string(settings.SPEAKING_TRANSCRIBER)
+
+
+def transcriber_name(transcribe) -> str:
+    if transcribe is transcribe_audio:
+        return TRANSCRIBE_MODEL
+    return f"{transcribe.__module__}.{transcribe.__qualname__}"
+
+
+# transcript cache (аудио мазмұнының хэші бойынша)
+def audio_content_hash(file) -> str:
+    h = hashlib.sha256()
+    for chunk in file.chunks(chunk_size=HASH_CHUNK_SIZE):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def transcribe_speaking_answer(sa: SpeakingAnswer, transcribe) -> str:
+    if not sa.audio_sha256:
+        try:
+            sa.audio_sha256 = audio_content_hash(sa.audio)
+        finally:
+            sa.audio.close()
+        sa.save(update_fields=["audio_sha256"])
+
+    model_name = transcriber_name(transcribe)
+    cached = (
+        SpeakingTranscript.objects
+        .filter(content_hash=sa.audio_sha256, model_name=model_name)
+        .values_list("transcript", flat=True)
+        .first()
+    )
+    if cached is not None:
+        return cached
+
+    transcript = transcribe(sa.audio.path)
+    if transcript:
+        SpeakingTranscript.objects.get_or_create(
+            content_hash=sa.audio_sha256,
+            model_name=model_name,
+            defaults={"transcript": transcript},
+        )
+    return transcript
+
+
+# enqueue_grading_jobs
+JOB_KIND_BY_QUESTION_TYPE = {
+    "speaking_keywords": GradingJob.Kind.SPEAKING,
+    "writing": GradingJob.Kind.WRITING,
+}
+
+
+def enqueue_grading_jobs(attempt) -> int:
+    rows = list(
+        QuestionAttempt.objects
+        .filter(
+            section_attempt__attempt=attempt,
+            question__question_type__in=JOB_KIND_BY_QUESTION_TYPE.keys(),
+            is_answered=True,
+            is_graded=False,
+        )
+        .values_list("id", "question__question_type")
+    )
+    if not rows:
+        return 0
+
+    now = timezone.now()
+    GradingJob.objects.bulk_create(
+        [
+            GradingJob(question_attempt_id=qa_id, kind=JOB_KIND_BY_QUESTION_TYPE[qtype], run_after=now)
+            for qa_id, qtype in rows
+        ],
+        update_conflicts=True,
+        unique_fields=["question_attempt", "kind"],
+        update_fields=["status", "attempts", "run_after", "locked_at", "last_error"],
+    )
+    return len(rows)
+
+
+def has_pending_grading(attempt) -> bool:
+    return GradingJob.objects.filter(
+        question_attempt__section_attempt__attempt=attempt,
+        status__in=[JobStatus.PENDING, JobStatus.RUNNING],
+    ).exists()
+
+
+# claim_grading_jobs
+@transaction.atomic
+def claim_grading_jobs(limit: int) -> list[int]:
+    now = timezone.now()
+    stale = now - timedelta(seconds=STALE_LOCK_SECONDS)
+    ids = list(
+        GradingJob.objects
+        .select_for_update(skip_locked=True)
+        .filter(
+            Q(status=JobStatus.PENDING, run_after__lte=now) |
+            Q(status=JobStatus.RUNNING, locked_at__lt=stale)
+        )
+        .order_by("run_after", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    if ids:
+        GradingJob.objects.filter(pk__in=ids).update(status=JobStatus.RUNNING, locked_at=now, updated_at=now)
+    return ids
+
+
+# grade_speaking_question
+def grade_speaking_question(qa: QuestionAttempt, transcribe) -> bool:
+    sa = SpeakingAnswer.objects.filter(question_attempt=qa).first()
+    if not sa or not sa.audio:
+        return False
+
+    rubric = SpeakingRubric.objects.filter(question_id=qa.question_id).first()
+    if not rubric:
+        return False
+
+    transcript = transcribe_speaking_answer(sa, transcribe)
+    matched = match_rubric_keywords(transcript, rubric)
+    points = score_speaking(matched, rubric.point_per_keyword, rubric.max_points)
+
+    sa.transcript = transcript
+    sa.matched_keywords = matched
+    sa.matched_count = len(matched)
+
+    qa.max_score = rubric.max_points
+    qa.score = points
+    qa.is_graded = True
+    qa.answer_json = {
+        "type": "speaking_keywords",
+        "transcript": transcript,
+        "matched_keywords": matched,
+    }
+
+    with transaction.atomic():
+        sa.save(update_fields=["transcript", "matched_keywords", "matched_count"])
+        qa.save(update_fields=["max_score", "score", "is_graded", "answer_json"])
+    return True
+
+
+# grade_writing_question
+def grade_writing_question(qa: QuestionAttempt) -> bool:
+    sub = (
+        WritingSubmission.objects
+        .select_related("question_attempt__question__writing")
+        .filter(question_attempt=qa)
+        .first()
+    )
+    if not sub:
+        return False
+
+    credit = grade_writing_submission(sub)
+    qa.score = ((qa.max_score or 0) * credit).quantize(Decimal("0.01"))
+    qa.is_graded = True
+    qa.answer_json = {"type": "writing", "correct": sub.is_correct, "credit": float(credit)}
+    qa.save(update_fields=["score", "is_graded", "answer_json"])
+    return True
+
+
+# run_grading_job
+def run_grading_job(job_id: int, transcribe=None, max_attempts: int | None = None) -> str:
+    from apps.main.services.attempt import recalc_attempt_scores
+
+    transcribe = transcribe or get_transcriber()
+    max_attempts = max_attempts or settings.GRADING_MAX_ATTEMPTS
+
+    job = (
+        GradingJob.objects
+        .select_related("question_attempt", "question_attempt__section_attempt__attempt")
+        .get(pk=job_id)
+    )
+    qa = job.question_attempt
+
+    # транскрипция/код орындау ұзақ, сондықтан DB транзакциясынан тыс жүреді
+    try:
+        if job.kind == GradingJob.Kind.WRITING:
+            grade_writing_question(qa)
+        else:
+            grade_speaking_question(qa, transcribe)
+        with transaction.atomic():
+            recalc_attempt_scores(qa.section_attempt.attempt)
+    except Exception as exc:
+        job.attempts += 1
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        job.locked_at = None
+        if job.attempts >= max_attempts:
+            job.status = JobStatus.FAILED
+        else:
+            job.status = JobStatus.PENDING
+            job.run_after = timezone.now() + timedelta(seconds=RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1))
+        job.save(update_fields=["attempts", "last_error", "locked_at", "status", "run_after", "updated_at"])
+        return job.status
+
+    job.status = JobStatus.DONE
+    job.locked_at = None
+    job.last_error = ""
+    job.save(update_fields=["status", "locked_at", "last_error", "updated_at"])
+    return job.status
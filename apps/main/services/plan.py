@@ -0,0 +1,92 @@
+from typing import NamedTuple
+from uuid import uuid4
+from django.core.cache import cache
+from django.db import transaction
+from core.models.attempts import QuestionAttempt
+
+
+ATTEMPT_PLAN_CACHE_TIMEOUT = 60 * 60
+ANSWERED_CACHE_TIMEOUT = 60 * 60 * 6
+
+
+# AttemptPlanItem: навигацияға керек бір сұрақтың ықшам жазбасы
+class AttemptPlanItem(NamedTuple):
+    qa_id: int
+    question_id: int
+    section_id: int
+    material_id: int | None
+
+
+def _cache_key(attempt_id: int) -> str:
+    return f"attempt_plan:{attempt_id}"
+
+
+def build_attempt_plan(attempt_id: int) -> tuple[AttemptPlanItem, ...]:
+    return tuple(
+        AttemptPlanItem(*row)
+        for row in (
+            QuestionAttempt.objects
+            .filter(section_attempt__attempt_id=attempt_id)
+            .order_by("order", "id")
+            .values_list("id", "question_id", "section_attempt__section_id", "section_material_id")
+        )
+    )
+
+
+def get_attempt_plan(attempt) -> tuple[AttemptPlanItem, ...]:
+    key = _cache_key(attempt.pk)
+    plan = cache.get(key)
+    if plan is None:
+        plan = build_attempt_plan(attempt.pk)
+        # бос жоспар кэштелмейді: attempt әлі инициализацияланбаған болуы мүмкін
+        if plan:
+            cache.set(key, plan, ATTEMPT_PLAN_CACHE_TIMEOUT)
+    return plan
+
+
+def invalidate_attempt_plan(attempt_id: int) -> None:
+    key = _cache_key(attempt_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+# ======================================================================================================================
+# Answered set: attempt-тің жауап берілген qa_id жиыны кэште бір кілтпен
+# ======================================================================================================================
+# Django cache-те CAS/SADD жоқ, сондықтан жиын орнында өзгертілмейді. Жазушы commit-тен кейін attempt-тің
+# токенін жаңа мәнге ауыстырады; оқушы жиынды DB-дан құрып, өзі көрген токенмен белгілеп сақтайды.
+# Токен сәйкес келмесе — жиын ескірген: кеш жазылған ескі мән жаңа жауаптың үстінен түспейді.
+def _answered_key(attempt_id: int) -> str:
+    return f"attempt_answered:{attempt_id}"
+
+
+def _answered_token_key(attempt_id: int) -> str:
+    return f"attempt_answered_token:{attempt_id}"
+
+
+def get_answered_q_ids(attempt, plan: tuple[AttemptPlanItem, ...]) -> set[int]:
+    token_key, set_key = _answered_token_key(attempt.pk), _answered_key(attempt.pk)
+    cached = cache.get_many([token_key, set_key])
+    token = cached.get(token_key)
+    stored = cached.get(set_key)
+
+    if token is not None and stored is not None and stored[0] == token:
+        answered_qa_ids = stored[1]
+    else:
+        if token is None:
+            cache.add(token_key, uuid4().hex, ANSWERED_CACHE_TIMEOUT)
+            token = cache.get(token_key)
+        answered_qa_ids = frozenset(
+            QuestionAttempt.objects
+            .filter(section_attempt__attempt_id=attempt.pk, is_answered=True)
+            .values_list("id", flat=True)
+        )
+        if token is not None:
+            cache.set(set_key, (token, answered_qa_ids), ANSWERED_CACHE_TIMEOUT)
+
+    return {item.question_id for item in plan if item.qa_id in answered_qa_ids}
+
+
+def mark_answered(attempt_id: int) -> None:
+    token_key = _answered_token_key(attempt_id)
+    transaction.on_commit(lambda: cache.set(token_key, uuid4().hex, ANSWERED_CACHE_TIMEOUT))
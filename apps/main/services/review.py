@@ -1,11 +1,164 @@
-from collections import defaultdict
+from dataclasses import dataclass
 from decimal import Decimal
 from django.db.models import Count
+from django.core.cache import cache
 from django.shortcuts import render
-from core.models import QuestionAttempt, MCQSelection, WritingSubmission, SpeakingAnswer, Option
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from apps.main.services.attempt import MCQ_TYPES, load_mcq_selections
+from apps.main.services.grading import has_pending_grading
+from core.models import (
+    AttemptStatus, Option, QuestionAttempt, SpeakingAnswer, SpeakingRubric, Writing, WritingSubmission,
+)
+
+
+REVIEW_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _review_cache_key(attempt, section_param: str, review_url_name: str, grading_pending: bool) -> str:
+    section_id = int(section_param) if section_param and str(section_param).isdigit() else 0
+    return (
+        f"attempt_review:{attempt.pk}:v{attempt.graded_version}:"
+        f"{section_id}:{review_url_name}:{int(grading_pending)}"
+    )
 
 
 def _build_review_response(request, attempt, review_url_name: str):
+    section_param = request.GET.get("section")
+    grading_pending = has_pending_grading(attempt)
+
+    # аяқталған attempt өзгермейді: фрагмент graded_version бойынша кэштеледі
+    cacheable = attempt.status in (AttemptStatus.FINISHED, AttemptStatus.ABORTED)
+    key = _review_cache_key(attempt, section_param, review_url_name, grading_pending)
+    body = cache.get(key) if cacheable else None
+    if body is None:
+        ctx = _build_review_context(attempt, section_param, review_url_name, grading_pending)
+        body = render_to_string("app/main/attempt/partials/review_body.html", ctx)
+        if cacheable:
+            cache.set(key, body, REVIEW_CACHE_TIMEOUT)
+
+    return render(request, "app/main/attempt/review.html", {
+        "attempt": attempt,
+        "review_body": mark_safe(body),
+    })
+
+
+# ======================================================================================================================
+# Review view models: шаблон ORM-ға жүгінбейді, барлық дерек алдын ала жүктеледі
+# ======================================================================================================================
+@dataclass(frozen=True)
+class ReviewOption:
+    id: int
+    text: str
+    is_selected: bool
+    is_correct: bool
+
+
+@dataclass(frozen=True)
+class ReviewRubric:
+    keywords: tuple[str, ...]
+    point_per_keyword: int
+    max_points: int
+
+
+@dataclass
+class ReviewQuestion:
+    qa_id: int
+    question_id: int
+    question_type: str
+    prompt: str
+    score: Decimal
+    max_score: Decimal
+    is_graded: bool
+    answer_json: dict
+    options: tuple[ReviewOption, ...] = ()
+    rubric: ReviewRubric | None = None
+    expected_output: str = ""
+    speaking: SpeakingAnswer | None = None
+    writing: WritingSubmission | None = None
+
+
+# build_review_items: сұрақ санына тәуелсіз, әр дерек түріне бір сұраныс
+def build_review_items(qas: list[QuestionAttempt]) -> list[ReviewQuestion]:
+    by_type: dict[str, list[QuestionAttempt]] = {}
+    for qa in qas:
+        by_type.setdefault(qa.question.question_type, []).append(qa)
+
+    mcq_qas = [qa for t in MCQ_TYPES for qa in by_type.get(t, [])]
+    speaking_qas = by_type.get("speaking_keywords", [])
+    writing_qas = by_type.get("writing", [])
+
+    options: dict[int, list[tuple[int, str, bool]]] = {}
+    selected: dict[int, set[int]] = {}
+    if mcq_qas:
+        for oid, qid, text, is_correct in (
+            Option.objects
+            .filter(question_id__in=[qa.question_id for qa in mcq_qas])
+            .order_by("id")
+            .values_list("id", "question_id", "text", "is_correct")
+        ):
+            options.setdefault(qid, []).append((oid, text, is_correct))
+        selected = load_mcq_selections(mcq_qas)
+
+    rubrics: dict[int, ReviewRubric] = {}
+    speaking: dict[int, SpeakingAnswer] = {}
+    if speaking_qas:
+        rubrics = {
+            qid: ReviewRubric(keywords=tuple(keywords or ()), point_per_keyword=ppk, max_points=max_points)
+            for qid, keywords, ppk, max_points in (
+                SpeakingRubric.objects
+                .filter(question_id__in=[qa.question_id for qa in speaking_qas])
+                .values_list("question_id", "keywords", "point_per_keyword", "max_points")
+            )
+        }
+        speaking = {
+            sa.question_attempt_id: sa
+            for sa in SpeakingAnswer.objects.filter(question_attempt__in=speaking_qas)
+        }
+
+    expected: dict[int, str] = {}
+    writing: dict[int, WritingSubmission] = {}
+    if writing_qas:
+        expected = dict(
+            Writing.objects
+            .filter(question_id__in=[qa.question_id for qa in writing_qas])
+            .values_list("question_id", "expected_output")
+        )
+        writing = {
+            ws.question_attempt_id: ws
+            for ws in WritingSubmission.objects.filter(question_attempt__in=writing_qas)
+        }
+
+    items = []
+    for qa in qas:
+        chosen = selected.get(qa.pk, set())
+        q_options = options.get(qa.question_id, [])
+        if qa.option_order:
+            # тапсырушы көрген ретпен
+            by_id = {o[0]: o for o in q_options}
+            q_options = [by_id[oid] for oid in qa.option_order if oid in by_id]
+        items.append(ReviewQuestion(
+            qa_id=qa.pk,
+            question_id=qa.question_id,
+            question_type=qa.question.question_type,
+            prompt=qa.question.prompt,
+            score=qa.score,
+            max_score=qa.max_score,
+            is_graded=qa.is_graded,
+            answer_json=qa.answer_json or {},
+            options=tuple(
+                ReviewOption(id=oid, text=text, is_selected=oid in chosen, is_correct=is_correct)
+                for oid, text, is_correct in q_options
+            ),
+            rubric=rubrics.get(qa.question_id),
+            expected_output=expected.get(qa.question_id, ""),
+            speaking=speaking.get(qa.pk),
+            writing=writing.get(qa.pk),
+        ))
+    return items
+
+
+def _build_review_context(attempt, section_param: str | None, review_url_name: str, grading_pending: bool) -> dict:
     sections = list(
         attempt.exam.sections.all().order_by("order", "id")
     )
@@ -35,7 +188,6 @@ def _build_review_response(request, attempt, review_url_name: str):
     )
     section_q_count = {row["section_attempt__section_id"]: row["c"] for row in counts_qs}
 
-    section_param = request.GET.get("section")
     current_section = None
     if section_param and str(section_param).isdigit():
         sid = int(section_param)
@@ -53,13 +205,7 @@ def _build_review_response(request, attempt, review_url_name: str):
                 section_attempt__attempt=attempt,
                 section_attempt__section=current_section,
             )
-            .select_related(
-                "question",
-                "section_attempt",
-                "section_attempt__section",
-                "section_material",
-            )
-            .prefetch_related("question__options")
+            .select_related("question", "section_material")
             .order_by("order", "id")
         )
 
@@ -68,38 +214,7 @@ def _build_review_response(request, attempt, review_url_name: str):
                 current_material = qa.section_material
                 break
 
-    qa_by_qid = {qa.question_id: qa for qa in current_qas}
-
-    selected_map = defaultdict(set)
-    if current_qas:
-        for qa_id, opt_id in (
-            MCQSelection.objects
-            .filter(question_attempt__in=current_qas)
-            .values_list("question_attempt_id", "option_id")
-        ):
-            selected_map[qa_id].add(opt_id)
-
-    correct_map = defaultdict(set)
-    shown_questions = [qa.question for qa in current_qas]
-    if shown_questions:
-        for qid, oid in (
-            Option.objects
-            .filter(question__in=shown_questions, is_correct=True)
-            .values_list("question_id", "id")
-        ):
-            correct_map[qid].add(oid)
-
-    speaking_map = {}
-    writing_map = {}
-    if current_qas:
-        speaking_map = {
-            sa.question_attempt_id: sa
-            for sa in SpeakingAnswer.objects.filter(question_attempt__in=current_qas)
-        }
-        writing_map = {
-            ws.question_attempt_id: ws
-            for ws in WritingSubmission.objects.filter(question_attempt__in=current_qas)
-        }
+    review_items = build_review_items(current_qas)
 
     sections_raw = sections
     wanted = ["reading", "listening", "speaking", "writing"]
@@ -115,12 +230,8 @@ def _build_review_response(request, attempt, review_url_name: str):
         "sections": sections,
         "section_q_count": section_q_count,
         "current_section": current_section,
-        "current_qas": current_qas,
         "current_material": current_material,
-        "qa_by_qid": qa_by_qid,
-        "selected_map": selected_map,
-        "correct_map": correct_map,
-        "speaking_map": speaking_map,
-        "writing_map": writing_map,
+        "review_items": review_items,
+        "grading_pending": grading_pending,
     }
-    return render(request, "app/main/attempt/review.html", ctx)
\ No newline at end of file
+    return ctx
@@ -0,0 +1,395 @@
+import hashlib
+import multiprocessing
+import os
+import resource
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+# ======================================================================================================================
+# Sandbox: жазбаша жауаптардың кодын шектеулі процесте орындау
+# ======================================================================================================================
+class RunStatus:
+    OK = "ok"
+    COMPILE_ERROR = "compile_error"
+    RUNTIME_ERROR = "runtime_error"
+    TIMEOUT = "timeout"
+    OUTPUT_LIMIT = "output_limit"
+    UNAVAILABLE = "unavailable"
+
+
+class Isolation:
+    # bubblewrap: бос, read-only түбір, желі жоқ, бөлек pid/user namespace
+    BWRAP = "bwrap"
+    # оқшаулаусыз — тек DEBUG режимінде жергілікті әзірлеу үшін
+    NONE = "none"
+
+
+@dataclass(frozen=True)
+class Limits:
+    cpu_seconds: int = 2
+    wall_seconds: float = 5.0
+    memory_mb: int = 256
+    output_kb: int = 1024
+    compile_seconds: float = 20.0
+    max_processes: int = 1024  # uid бойынша ортақ шек, settings.SANDBOX_MAX_PROCESSES қараңыз
+
+
+@dataclass
+class ExecutionResult:
+    status: str
+    stdout: str = ""
+    stderr: str = ""
+    exit_code: int | None = None
+    time_ms: int = 0
+
+
+@dataclass(frozen=True)
+class LanguageSpec:
+    source_name: str
+    compile: tuple[str, ...] | None
+    run: tuple[str, ...]
+    limit_address_space: bool = True
+
+
+# {src} — бастапқы файл, {out} — компиляция каталогы, {mem} — жад шегі (MB)
+LANGUAGES: dict[str, LanguageSpec] = {
+    "python": LanguageSpec("main.py", None, ("python3", "-I", "{src}")),
+    "cpp": LanguageSpec("main.cpp", ("g++", "-O2", "-std=c++17", "-o", "{out}/main", "{src}"), ("{out}/main",)),
+    # V8 пен JVM виртуал жадты көп резервтейді, сондықтан шек heap параметрі арқылы қойылады
+    "js": LanguageSpec("main.js", None, ("node", "--max-old-space-size={mem}", "{src}"), limit_address_space=False),
+    "java": LanguageSpec(
+        "Main.java", ("javac", "-d", "{out}", "{src}"), ("java", "-Xmx{mem}m", "-cp", "{out}", "Main"),
+        limit_address_space=False,
+    ),
+}
+
+SANDBOX_ENV = {"PATH": "/usr/local/bin:/usr/bin:/bin", "LANG": "C.UTF-8", "HOME": "/tmp"}
+
+# sandbox ішінде тек осы жүйелік каталогтар read-only көрінеді; жоба каталогы, .env, /home, /etc/... жоқ
+DEFAULT_RO_PATHS = (
+    "/usr", "/bin", "/lib", "/lib32", "/lib64",
+    "/etc/alternatives", "/etc/ld.so.cache", "/etc/ld.so.conf", "/etc/ld.so.conf.d",
+)
+BOX_DIR = "/box"
+BOX_UID = 65534  # nobody
+BOX_TMP_BYTES = 16 * 1024 * 1024
+
+
+def is_language_available(language: str) -> bool:
+    spec = LANGUAGES.get(language)
+    if not spec:
+        return False
+    tools = [spec.run[0]] + ([spec.compile[0]] if spec.compile else [])
+    return all(t.startswith("{") or shutil.which(t, path=SANDBOX_ENV["PATH"]) for t in tools)
+
+
+def is_isolation_available(isolation: str) -> bool:
+    if isolation == Isolation.BWRAP:
+        return shutil.which("bwrap", path=SANDBOX_ENV["PATH"]) is not None
+    return isolation == Isolation.NONE
+
+
+def _preexec(limits: Limits, limit_address_space: bool):
+    def apply():
+        resource.setrlimit(resource.RLIMIT_CPU, (limits.cpu_seconds, limits.cpu_seconds + 1))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (limits.output_kb * 1024, limits.output_kb * 1024))
+        resource.setrlimit(resource.RLIMIT_NOFILE, (64, 64))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        resource.setrlimit(resource.RLIMIT_NPROC, (limits.max_processes, limits.max_processes))
+        if limit_address_space:
+            mem = limits.memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (mem, mem))
+    return apply
+
+
+# _wrap: sandbox ішінде тек ro_paths пен box каталогы (BOX_DIR ретінде) көрінеді
+def _wrap(cmd: list[str], isolation: str, box: Path, box_writable: bool, ro_paths) -> list[str]:
+    if isolation == Isolation.NONE:
+        return cmd
+
+    args = [
+        "bwrap",
+        "--unshare-all", "--unshare-user", "--die-with-parent", "--new-session", "--cap-drop", "ALL",
+        "--uid", str(BOX_UID), "--gid", str(BOX_UID),
+    ]
+    for path in ro_paths:
+        args += ["--ro-bind-try", path, path]
+    args += [
+        "--proc", "/proc",
+        "--dev", "/dev",
+        "--size", str(BOX_TMP_BYTES), "--tmpfs", "/tmp",
+        "--bind" if box_writable else "--ro-bind", str(box), BOX_DIR,
+        "--remount-ro", "/",
+        "--chdir", BOX_DIR,
+        "--",
+    ]
+    return args + cmd
+
+
+def _format(parts, **values) -> list[str]:
+    return [p.format(**values) for p in parts]
+
+
+def _box_path(isolation: str, host_dir: Path) -> Path:
+    return host_dir if isolation == Isolation.NONE else Path(BOX_DIR)
+
+
+def _run(cmd, cwd, stdin: str, limits: Limits, limit_address_space: bool, stdout_path: Path, wall: float):
+    # процесс тобы әрқашан жойылады: фонға кеткен ұрпақ процестер де қалмайды
+    # (bwrap режимінде pid namespace init-і өлгенде ядро ішіндегінің бәрін өлтіреді)
+    started = time.monotonic()
+    with open(stdout_path, "wb") as out, tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=out,
+            stderr=err,
+            env=SANDBOX_ENV,
+            start_new_session=True,
+            preexec_fn=_preexec(limits, limit_address_space),
+        )
+        timed_out = False
+        try:
+            proc.communicate(input=(stdin or "").encode(), timeout=wall)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            proc.wait()
+
+        err.seek(0)
+        stderr = err.read(16 * 1024).decode("utf-8", "replace")
+
+    elapsed = int((time.monotonic() - started) * 1000)
+    return proc.returncode, timed_out, stderr, elapsed
+
+
+# compile cache: бастапқы кодтың хэші бойынша
+def _compile(spec: LanguageSpec, language: str, code: str, cache_dir: Path, isolation: str, ro_paths, limits: Limits):
+    digest = hashlib.sha256(code.encode("utf-8")).hexdigest()
+    target = cache_dir / language / digest
+    try:
+        # mtime — соңғы қолданылған уақыт: purge_compile_cache ескі жазбаларды осы бойынша өшіреді
+        os.utime(target)
+        return target, None
+    except FileNotFoundError:
+        pass
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    build = Path(tempfile.mkdtemp(prefix=f"{digest[:12]}-", dir=target.parent))
+    src = build / spec.source_name
+    src.write_text(code, encoding="utf-8")
+
+    compile_limits = Limits(
+        cpu_seconds=int(limits.compile_seconds), wall_seconds=limits.compile_seconds,
+        memory_mb=max(limits.memory_mb, 1024), output_kb=64 * 1024, max_processes=limits.max_processes,
+    )
+    box = _box_path(isolation, build)
+    cmd = _wrap(
+        _format(spec.compile, src=box / spec.source_name, out=box, mem=limits.memory_mb),
+        isolation, build, True, ro_paths,
+    )
+    code_, timed_out, stderr, _ = _run(
+        cmd, build, "", compile_limits, False, build / "compile.out", compile_limits.wall_seconds,
+    )
+    if timed_out or code_ != 0:
+        shutil.rmtree(build, ignore_errors=True)
+        return None, stderr or "compilation timed out"
+
+    try:
+        build.rename(target)
+    except OSError:
+        # басқа процесс дәл осы кодты ертерек компиляциялап үлгерді
+        shutil.rmtree(build, ignore_errors=True)
+    return target, None
+
+
+def purge_compile_cache(cache_dir: str, max_age_hours: int, max_mb: int) -> int:
+    """Ұзақ қолданылмаған, содан соң көлем шегінен асқан ең ескі компиляция нәтижелерін өшіреді."""
+    root = Path(cache_dir) / "csgrade-sandbox"
+    if not root.is_dir():
+        return 0
+
+    entries = []
+    for lang_dir in root.iterdir():
+        if not lang_dir.is_dir():
+            continue
+        for entry in lang_dir.iterdir():
+            try:
+                mtime = entry.stat().st_mtime
+                size = sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+            except OSError:
+                continue
+            entries.append((mtime, size, entry))
+    entries.sort(key=lambda e: e[0])
+
+    cutoff = time.time() - max_age_hours * 3600
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, entry in entries:
+        # "<digest[:12]>-..." — әлі жүріп жатқан компиляция, оны тек ескі болса ғана өшіреміз
+        building = "-" in entry.name
+        if mtime >= cutoff and (building or total <= max_mb * 1024 * 1024):
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+# execute
+def execute(
+    language: str,
+    code: str,
+    stdin: str = "",
+    limits: Limits | None = None,
+    cache_dir: str | None = None,
+    isolation: str = Isolation.BWRAP,
+    ro_paths=DEFAULT_RO_PATHS,
+) -> ExecutionResult:
+    limits = limits or Limits()
+    spec = LANGUAGES.get(language)
+    if spec is None or not is_language_available(language):
+        return ExecutionResult(status=RunStatus.UNAVAILABLE, stderr=f"{language} runtime is not available")
+    if not is_isolation_available(isolation):
+        return ExecutionResult(status=RunStatus.UNAVAILABLE, stderr=f"{isolation} sandbox is not available")
+
+    cache = Path(cache_dir or tempfile.gettempdir()) / "csgrade-sandbox"
+    workdir = Path(tempfile.mkdtemp(prefix="run-"))
+    try:
+        if spec.compile:
+            out_dir, error = _compile(spec, language, code, cache, isolation, ro_paths, limits)
+            if out_dir is None:
+                return ExecutionResult(status=RunStatus.COMPILE_ERROR, stderr=error)
+        else:
+            out_dir = workdir / "box"
+            out_dir.mkdir()
+            (out_dir / spec.source_name).write_text(code, encoding="utf-8")
+
+        # stdout box-тан тыс жазылады; бағдарлама box-ты тек оқи алады
+        box = _box_path(isolation, out_dir)
+        cmd = _wrap(
+            _format(spec.run, src=box / spec.source_name, out=box, mem=limits.memory_mb),
+            isolation, out_dir, False, ro_paths,
+        )
+        stdout_path = workdir / "stdout"
+        exit_code, timed_out, stderr, elapsed = _run(
+            cmd, out_dir, stdin, limits, spec.limit_address_space, stdout_path, limits.wall_seconds,
+        )
+        if isolation == Isolation.BWRAP and exit_code is not None and exit_code > 128:
+            # bwrap сигналмен өлген процестің кодын 128 + signum ретінде қайтарады
+            exit_code = 128 - exit_code
+
+        if timed_out or exit_code in (-signal.SIGXCPU, -signal.SIGKILL):
+            status = RunStatus.TIMEOUT
+        elif exit_code == -signal.SIGXFSZ or stdout_path.stat().st_size >= limits.output_kb * 1024:
+            status = RunStatus.OUTPUT_LIMIT
+        elif exit_code != 0:
+            status = RunStatus.RUNTIME_ERROR
+        else:
+            status = RunStatus.OK
+
+        with open(stdout_path, "rb") as f:
+            stdout = f.read(limits.output_kb * 1024).decode("utf-8", "replace")
+
+        return ExecutionResult(status=status, stdout=stdout, stderr=stderr, exit_code=exit_code, time_ms=elapsed)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# ======================================================================================================================
+# Process pool: алдын ала іске қосылған worker процестер
+# ======================================================================================================================
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def default_limits() -> Limits:
+    return Limits(
+        cpu_seconds=settings.SANDBOX_CPU_SECONDS,
+        wall_seconds=settings.SANDBOX_WALL_SECONDS,
+        memory_mb=settings.SANDBOX_MEMORY_MB,
+        output_kb=settings.SANDBOX_OUTPUT_KB,
+        max_processes=settings.SANDBOX_MAX_PROCESSES,
+    )
+
+
+# sandbox_isolation: оқшаулау орнатылмаса немесе қолжетімсіз болса, код мүлдем орындалмайды
+def sandbox_isolation() -> str:
+    isolation = settings.SANDBOX_ISOLATION
+    if isolation not in (Isolation.BWRAP, Isolation.NONE):
+        raise ImproperlyConfigured(f"Unknown SANDBOX_ISOLATION: {isolation!r}")
+    if isolation == Isolation.NONE and not settings.DEBUG:
+        raise ImproperlyConfigured("SANDBOX_ISOLATION='none' is only allowed with DEBUG=True")
+    if isolation == Isolation.BWRAP and os.geteuid() == 0:
+        raise ImproperlyConfigured("Sandbox must run under a dedicated unprivileged user, not root")
+    return isolation
+
+
+def pool_size() -> int:
+    return settings.SANDBOX_WORKERS or os.cpu_count() or 1
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            sandbox_isolation()
+            workers = pool_size()
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver"))
+            # барлық worker-ді бірден көтереміз, бірінші submission күтпеуі үшін
+            for f in [pool.submit(_ping) for _ in range(workers)]:
+                f.result()
+            _pool = pool
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def submit_to_pool(language: str, code: str, stdin: str = "", limits: Limits | None = None) -> Future:
+    args = (
+        language, code, stdin, limits or default_limits(),
+        str(settings.SANDBOX_CACHE_DIR), sandbox_isolation(), tuple(settings.SANDBOX_RO_PATHS),
+    )
+    pool = get_pool()
+    try:
+        return pool.submit(execute, *args)
+    except BrokenProcessPool:
+        # worker өлсе (OOM killer, SIGKILL) pool қайта қолданылмайды: бір рет жаңасы көтеріледі
+        _discard_pool(pool)
+        return get_pool().submit(execute, *args)
+
+
+def run_in_pool(language: str, code: str, stdin: str = "", limits: Limits | None = None) -> ExecutionResult:
+    try:
+        return submit_to_pool(language, code, stdin, limits).result()
+    except BrokenProcessPool:
+        # орындалу кезінде pool бұзылды: келесі submit оны ауыстырады
+        return submit_to_pool(language, code, stdin, limits).result()
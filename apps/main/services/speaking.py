@@ -1,53 +1,108 @@
+from functools import lru_cache
 from django.conf import settings
 from openai import OpenAI
 import re
+from core.utils.stemming import stem_token, stem_phrase
 
 client = OpenAI(api_key=settings.OPENAI_API_KEY)
+TRANSCRIBE_MODEL = "gpt-4o-mini-transcribe"
 
 def transcribe_audio(file_path: str) -> str:
     with open(file_path, "rb") as f:
         res = client.audio.transcriptions.create(
-            model="gpt-4o-mini-transcribe",
+            model=TRANSCRIBE_MODEL,
             file=f,
         )
     # docs бойынша json response, негізгі мәтін res.text болуы мүмкін
     return getattr(res, "text", "") or ""
 
 
+def stub_transcribe_audio(file_path: str) -> str:
+    # offline тест үшін: аудио жанындағы <file>.txt мәтінін қайтарады
+    try:
+        with open(f"{file_path}.txt", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
 
-def _normalize(s: str) -> str:
-    s = s.lower().strip()
-    s = re.sub(r"[^\w\s]+", " ", s, flags=re.UNICODE)
-    s = re.sub(r"\s+", " ", s, flags=re.UNICODE)
-    return s
 
-def match_keywords(transcript: str, keywords: list[str]) -> list[str]:
-    t = _normalize(transcript)
-    matched = []
-
-    for kw in (keywords or []):
-        if not isinstance(kw, str):
-            continue
-        k = _normalize(kw)
-        if not k:
-            continue
-
-        if " " in k:
-            if k in t:
-                matched.append(kw)
-        else:
-            if re.search(rf"\b{re.escape(k)}\b", t, flags=re.UNICODE):
-                matched.append(kw)
-
-    # unique, original form-да сақтаймыз
-    uniq = []
-    seen = set()
-    for m in matched:
-        key = m.strip().lower()
-        if key and key not in seen:
+_TOKEN_RE = re.compile(r"\w+", flags=re.UNICODE)
+
+
+def _tokens(s: str) -> list[str]:
+    # _normalize + split(" ") нәтижесімен бірдей: пунктуация мен бос орын токен бөлгіш
+    return _TOKEN_RE.findall((s or "").lower())
+
+
+# KeywordMatcher: рубрика кілт сөздері бір рет компиляцияланады
+class KeywordMatcher:
+    def __init__(self, keywords, phrases=None, stem: bool = False):
+        self.keywords: list[str] = []
+        self._index: dict[str, list[tuple[list[str], int]]] = {}
+        self._stem = stem
+
+        if phrases is None:
+            phrases = [_tokens(kw) if isinstance(kw, str) else [] for kw in keywords]
+
+        seen = set()
+        for kw, phrase in zip(keywords, phrases):
+            if not isinstance(kw, str):
+                continue
+            key = kw.strip().lower()
+            phrase = list(phrase)
+            if not phrase or key in seen:
+                continue
             seen.add(key)
-            uniq.append(m.strip())
-    return uniq
+            self._index.setdefault(phrase[0], []).append((phrase, len(self.keywords)))
+            self.keywords.append(kw.strip())
+
+    def match(self, transcript: str) -> list[str]:
+        tokens = _tokens(transcript)
+        if self._stem:
+            tokens = [stem_token(t) for t in tokens]
+
+        found = set()
+        for i, tok in enumerate(tokens):
+            for phrase, idx in self._index.get(tok, ()):
+                if idx in found:
+                    continue
+                n = len(phrase)
+                if n == 1 or tokens[i:i + n] == phrase:
+                    found.add(idx)
+        return [self.keywords[idx] for idx in sorted(found)]
+
+
+@lru_cache(maxsize=1024)
+def _compiled_matcher(keywords: tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+@lru_cache(maxsize=1024)
+def _compiled_stem_matcher(keywords: tuple[str, ...], stems: tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords, phrases=[s.split() for s in stems], stem=True)
+
+
+def get_keyword_matcher(keywords) -> KeywordMatcher:
+    return _compiled_matcher(tuple(k for k in (keywords or []) if isinstance(k, str)))
+
+
+def get_rubric_matcher(rubric) -> KeywordMatcher:
+    keywords = tuple(k for k in (rubric.keywords or []) if isinstance(k, str))
+    if not rubric.use_stemming:
+        return _compiled_matcher(keywords)
+
+    stems = rubric.keyword_stems or []
+    if len(stems) != len(keywords):
+        stems = [stem_phrase(k) for k in keywords]
+    return _compiled_stem_matcher(keywords, tuple(stems))
+
+
+def match_keywords(transcript: str, keywords: list[str]) -> list[str]:
+    return get_keyword_matcher(keywords).match(transcript)
+
+
+def match_rubric_keywords(transcript: str, rubric) -> list[str]:
+    return get_rubric_matcher(rubric).match(transcript)
 
 def score_speaking(matched_keywords: list[str], point_per_keyword: int, max_points: int) -> int:
     raw = len(matched_keywords) * int(point_per_keyword or 0)
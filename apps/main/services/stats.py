@@ -0,0 +1,174 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from core.models import DailyScoreStat, ExamScoreStat, STAT_TOTAL, UserScoreStat
+from core.models.attempts import AttemptStatus, ExamAttempt, SectionAttempt
+
+
+STATS_CHUNK_SIZE = 500
+
+# (модель, өлшем өрісі, snapshot кілті)
+STAT_DIMENSIONS = (
+    (ExamScoreStat, "exam_id", "exam"),
+    (UserScoreStat, "user_id", "user"),
+    (DailyScoreStat, "day", "day"),
+)
+
+
+def _percent(score, max_score) -> float | None:
+    if not max_score:
+        return None
+    return float(score or 0) * 100.0 / float(max_score)
+
+
+# build_stats_snapshot: бір attempt-тің статистикаға қосатын үлесі ({"parts": {section_type: [пайыз қосындысы, саны]}})
+def build_stats_snapshot(attempt: ExamAttempt, sections: list[tuple[str, object, object]]) -> dict:
+    if attempt.status != AttemptStatus.FINISHED:
+        return {}
+
+    parts: dict[str, list] = {}
+    total = _percent(attempt.total_score, attempt.max_total_score)
+    if total is not None:
+        parts[STAT_TOTAL] = [total, 1]
+    for section_type, score, max_score in sections:
+        percent = _percent(score, max_score)
+        if percent is None:
+            continue
+        part = parts.setdefault(section_type, [0.0, 0])
+        part[0] += percent
+        part[1] += 1
+
+    if not parts:
+        return {}
+    finished_at = attempt.finished_at or timezone.now()
+    return {
+        "exam": attempt.exam_id,
+        "user": attempt.user_id,
+        "day": timezone.localdate(finished_at).isoformat(),
+        "parts": parts,
+    }
+
+
+def _accumulate(deltas, snapshot: dict, sign: int) -> None:
+    for model, _field, key in STAT_DIMENSIONS:
+        for section_type, (percent_sum, count) in snapshot.get("parts", {}).items():
+            delta = deltas[(model, snapshot[key], section_type)]
+            delta[0] += sign * percent_sum
+            delta[1] += sign * count
+
+
+def _apply_deltas(deltas) -> None:
+    for model, field, _key in STAT_DIMENSIONS:
+        # кілттер сұрыпталады: параллель транзакциялар жолдарды бір ретпен құлыптайды
+        items = sorted(
+            (dim, section_type, delta)
+            for (m, dim, section_type), delta in deltas.items()
+            if m is model and (delta[0] or delta[1])
+        )
+        if not items:
+            continue
+        model.objects.bulk_create(
+            [model(**{field: dim, "section_type": section_type}) for dim, section_type, _delta in items],
+            ignore_conflicts=True,
+        )
+        for dim, section_type, (percent_sum, count) in items:
+            model.objects.filter(**{field: dim, "section_type": section_type}).update(
+                percent_sum=F("percent_sum") + percent_sum,
+                attempts_count=F("attempts_count") + count,
+                updated_at=timezone.now(),
+            )
+
+
+def _load_sections(attempt_ids) -> dict[int, list]:
+    sections = defaultdict(list)
+    for attempt_id, section_type, score, max_score in (
+        SectionAttempt.objects
+        .filter(attempt_id__in=attempt_ids)
+        .values_list("attempt_id", "section__section_type", "score", "max_score")
+    ):
+        sections[attempt_id].append((section_type, score, max_score))
+    return sections
+
+
+# refresh_attempts_stats: attempt аяқталғанда не қайта бағаланғанда — ескі үлес алынып, жаңасы қосылады
+@transaction.atomic
+def refresh_attempts_stats(attempt_ids) -> None:
+    attempts = list(
+        ExamAttempt.objects
+        .select_for_update()
+        .filter(pk__in=list(attempt_ids))
+        .only("id", "exam_id", "user_id", "status", "total_score", "max_total_score", "finished_at", "stats_snapshot")
+        .order_by("pk")
+    )
+    sections = _load_sections([a.pk for a in attempts])
+
+    deltas = defaultdict(lambda: [0.0, 0])
+    changed = []
+    for attempt in attempts:
+        snapshot = build_stats_snapshot(attempt, sections.get(attempt.pk, []))
+        if snapshot == (attempt.stats_snapshot or {}):
+            continue
+        _accumulate(deltas, attempt.stats_snapshot or {}, -1)
+        _accumulate(deltas, snapshot, +1)
+        attempt.stats_snapshot = snapshot
+        changed.append(attempt)
+
+    if changed:
+        ExamAttempt.objects.bulk_update(changed, ["stats_snapshot"], batch_size=STATS_CHUNK_SIZE)
+        _apply_deltas(deltas)
+
+
+# rebuild_score_stats: барлық кестені attempt-терден қайта құру (rebuild_score_stats командасы)
+def rebuild_score_stats(chunk_size: int = STATS_CHUNK_SIZE) -> int:
+    totals = defaultdict(lambda: [0.0, 0])
+    attempt_ids = list(ExamAttempt.objects.order_by("pk").values_list("pk", flat=True))
+
+    with transaction.atomic():
+        for i in range(0, len(attempt_ids), chunk_size):
+            chunk = attempt_ids[i:i + chunk_size]
+            attempts = list(
+                ExamAttempt.objects
+                .filter(pk__in=chunk)
+                .only("id", "exam_id", "user_id", "status", "total_score", "max_total_score", "finished_at")
+            )
+            sections = _load_sections(chunk)
+            for attempt in attempts:
+                attempt.stats_snapshot = build_stats_snapshot(attempt, sections.get(attempt.pk, []))
+                _accumulate(totals, attempt.stats_snapshot, +1)
+            ExamAttempt.objects.bulk_update(attempts, ["stats_snapshot"], batch_size=chunk_size)
+
+        for model, field, _key in STAT_DIMENSIONS:
+            model.objects.all().delete()
+            model.objects.bulk_create(
+                [
+                    model(**{field: dim, "section_type": section_type}, percent_sum=percent_sum, attempts_count=count)
+                    for (m, dim, section_type), (percent_sum, count) in totals.items()
+                    if m is model and count
+                ],
+                batch_size=chunk_size,
+            )
+    return len(attempt_ids)
+
+
+# dashboard оқулары: бірнеше дайын жол, attempt кестелерін сканерлемейді
+def _avg_map(qs) -> dict[str, float | None]:
+    result = {}
+    for section_type, percent_sum, count in (
+        qs.values("section_type")
+        .annotate(s=Sum("percent_sum"), n=Sum("attempts_count"))
+        .values_list("section_type", "s", "n")
+    ):
+        result[section_type] = percent_sum / count if count else None
+    return result
+
+
+def get_exam_score_averages(exam_id=None) -> dict[str, float | None]:
+    qs = ExamScoreStat.objects.all()
+    if exam_id:
+        qs = qs.filter(exam_id=exam_id)
+    return _avg_map(qs)
+
+
+def get_user_score_averages(user_id: int) -> dict[str, float | None]:
+    return _avg_map(UserScoreStat.objects.filter(user_id=user_id))
@@ -1,26 +1,144 @@
-import re
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from decimal import Decimal
 from django.utils import timezone
-from core.models import Writing, WritingSubmission
+from apps.main.services.sandbox import RunStatus, is_language_available, submit_to_pool
+from core.models import Writing, WritingSubmission, WritingTestCase
+from core.utils.output import outputs_match
 
 
-def normalize_output(s: str) -> str:
-    s = (s or "").replace("\r\n", "\n").replace("\r", "\n").strip()
-    lines = [re.sub(r"\s+", " ", line).strip() for line in s.split("\n")]
-    while lines and lines[0] == "":
-        lines.pop(0)
-    while lines and lines[-1] == "":
-        lines.pop()
-    return "\n".join(lines)
+RUN_OUTPUT_MAX_CHARS = 64 * 1024
 
 
-def grade_writing_submission(submission: WritingSubmission) -> bool:
+class SandboxUnavailable(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class CaseSpec:
+    id: int | None
+    stdin: str
+    expected: str  # сақтау кезінде normalize_output арқылы дайындалған
+    weight: int
+    hidden: bool = True
+
+
+@dataclass
+class CaseOutcome:
+    case: CaseSpec
+    status: str
+    passed: bool
+    time_ms: int
+    output: str
+
+
+def load_test_cases(writing: Writing) -> list[CaseSpec]:
+    cases = [
+        CaseSpec(id=cid, stdin=stdin or "", expected=expected or "", weight=weight, hidden=hidden)
+        for cid, stdin, expected, weight, hidden in (
+            WritingTestCase.objects
+            .filter(question_id=writing.question_id)
+            .order_by("order", "id")
+            .values_list("id", "stdin", "expected_normalized", "weight", "is_hidden")
+        )
+    ]
+    # тест жағдайлары жоқ есептер үшін бұрынғы бір expected_output
+    return cases or [CaseSpec(id=None, stdin="", expected=writing.expected_normalized, weight=1)]
+
+
+def _outcome(case: CaseSpec, result, tolerance: float | None) -> CaseOutcome:
+    if result.status == RunStatus.UNAVAILABLE:
+        raise SandboxUnavailable(result.stderr)
+    passed = result.status == RunStatus.OK and outputs_match(result.stdout, case.expected, tolerance)
+    # жасырын тесттің шығысы (stdout/stderr) оқушыға көрінбейді; компиляция қатесі енгізуге тәуелсіз
+    if result.status == RunStatus.COMPILE_ERROR:
+        output = result.stderr
+    elif case.hidden:
+        output = ""
+    else:
+        output = result.stdout if result.status == RunStatus.OK else result.stderr
+    return CaseOutcome(case=case, status=result.status, passed=passed, time_ms=result.time_ms, output=output)
+
+
+# run_test_cases
+def run_test_cases(
+    language: str,
+    code: str,
+    cases: list[CaseSpec],
+    stop_on_failure: bool,
+    tolerance: float | None = None,
+    submit=submit_to_pool,
+):
+    # бірінші кейс жеке орындалады: компиляция кэшін толтырады, компиляция қатесінде қалғаны жіберілмейді
+    first = _outcome(cases[0], submit(language, code, cases[0].stdin).result(), tolerance)
+    outcomes = [first]
+    if first.status == RunStatus.COMPILE_ERROR or (stop_on_failure and not first.passed):
+        return outcomes
+
+    futures = {submit(language, code, case.stdin): case for case in cases[1:]}
+    for future in as_completed(futures):
+        outcome = _outcome(futures[future], future.result(), tolerance)
+        outcomes.append(outcome)
+        if stop_on_failure and not outcome.passed:
+            for f in futures:
+                f.cancel()
+            break
+    return outcomes
+
+
+# grade_writing_submission: 0..1 аралығындағы үлесті қайтарады
+# sandbox/runtime қолжетімсіз болса SandboxUnavailable көтеріледі — job кейін қайта орындалады
+def grade_writing_submission(submission: WritingSubmission, submit=submit_to_pool) -> Decimal:
     writing: Writing = submission.question_attempt.question.writing
-    expected = getattr(writing, "expected_output", "") or ""
-    user_out = submission.output_text or ""
-    is_correct = normalize_output(user_out) == normalize_output(expected)
+    update_fields = ["is_correct", "checked_at"]
+    has_code = bool((submission.code or "").strip())
+
+    if writing.requires_code and has_code and not is_language_available(submission.language):
+        raise SandboxUnavailable(f"{submission.language} runtime is not available")
+
+    if writing.requires_code and not has_code:
+        # код талап етілетін есепте қолмен енгізілген output есепке алынбайды
+        is_correct = False
+        credit = Decimal(0)
+    elif has_code and is_language_available(submission.language):
+        # код бар болса — нәтиже нақты орындалған бағдарлама шығысынан алынады
+        cases = load_test_cases(writing)
+        all_or_nothing = writing.scoring_mode == Writing.ScoringMode.ALL_OR_NOTHING
+        outcomes = run_test_cases(
+            submission.language, submission.code, cases, all_or_nothing, writing.float_tolerance, submit,
+        )
+        order = {case: i for i, case in enumerate(cases)}
+        outcomes.sort(key=lambda o: order[o.case])
+
+        total_weight = sum(c.weight for c in cases)
+        passed_weight = sum(o.case.weight for o in outcomes if o.passed)
+        all_passed = len(outcomes) == len(cases) and all(o.passed for o in outcomes)
+        if all_or_nothing or not total_weight:
+            credit = Decimal(1) if all_passed else Decimal(0)
+        else:
+            credit = Decimal(passed_weight) / Decimal(total_weight)
+
+        shown = next((o for o in outcomes if not o.passed), outcomes[0])
+        submission.run_status = shown.status
+        submission.run_output = shown.output[:RUN_OUTPUT_MAX_CHARS]
+        # ең баяу кейс — pool өлшемін таңдауға керек көрсеткіш
+        submission.run_time_ms = max(o.time_ms for o in outcomes)
+        submission.case_results = [
+            {
+                "id": o.case.id, "status": o.status, "passed": o.passed,
+                "time_ms": o.time_ms, "weight": o.case.weight, "hidden": o.case.hidden,
+            }
+            for o in outcomes
+        ]
+        update_fields += ["run_status", "run_output", "run_time_ms", "case_results"]
+        is_correct = all_passed
+    else:
+        user_out = submission.output_text or ""
+        is_correct = outputs_match(user_out, load_test_cases(writing)[0].expected, writing.float_tolerance)
+        credit = Decimal(1) if is_correct else Decimal(0)
 
     submission.is_correct = is_correct
     submission.checked_at = timezone.now()
-    submission.save(update_fields=["is_correct", "checked_at"])
+    submission.save(update_fields=update_fields)
 
-    return is_correct
+    return credit
@@ -0,0 +1,67 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from apps.main.services.blueprint import bump_exam_content_version
+from core.models import Section, SectionMaterial, Question, Option
+
+
+# әр модельден оның емтиханына дейінгі жол
+EXAM_ID_LOOKUPS = {
+    Section: "exam_id",
+    SectionMaterial: "section__exam_id",
+    Question: "section__exam_id",
+    Option: "question__section__exam_id",
+}
+
+
+def _section_exam_id(section_id):
+    if not section_id:
+        return None
+    return Section.objects.filter(pk=section_id).values_list("exam_id", flat=True).first()
+
+
+def _question_exam_id(question_id):
+    if not question_id:
+        return None
+    return Question.objects.filter(pk=question_id).values_list("section__exam_id", flat=True).first()
+
+
+def _bump(instance, exam_id):
+    bump_exam_content_version(exam_id)
+    # объект басқа емтиханға ауысса, ескі емтиханның кэші де ескіреді
+    old_exam_id = instance.__dict__.pop("_old_exam_id", None)
+    if old_exam_id != exam_id:
+        bump_exam_content_version(old_exam_id)
+
+
+# Exam blueprint / answer key invalidation: кэш кілттеріндегі content_version өседі
+# ======================================================================================================================
+@receiver(pre_save, sender=Section)
+@receiver(pre_save, sender=SectionMaterial)
+@receiver(pre_save, sender=Question)
+@receiver(pre_save, sender=Option)
+def remember_old_exam(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    instance._old_exam_id = (
+        sender.objects.filter(pk=instance.pk).values_list(EXAM_ID_LOOKUPS[sender], flat=True).first()
+    )
+
+
+@receiver([post_save, post_delete], sender=Section)
+def section_changed(sender, instance, **kwargs):
+    _bump(instance, instance.exam_id)
+
+
+@receiver([post_save, post_delete], sender=SectionMaterial)
+def section_material_changed(sender, instance, **kwargs):
+    _bump(instance, _section_exam_id(instance.section_id))
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    _bump(instance, _section_exam_id(instance.section_id))
+
+
+@receiver([post_save, post_delete], sender=Option)
+def option_changed(sender, instance, **kwargs):
+    _bump(instance, _question_exam_id(instance.question_id))
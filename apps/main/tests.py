@@ -0,0 +1,165 @@
+from decimal import Decimal
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase, TestCase, override_settings
+from apps.main.services.review import _build_review_context
+from apps.main.services.speaking import KeywordMatcher
+from core.models import (
+    AttemptStatus, Exam, ExamAttempt, Option, Question, QuestionAttempt, Section, SectionAttempt,
+    SectionMaterial, SpeakingAnswer, SpeakingRubric, User, Writing, WritingSubmission, WritingTestCase,
+)
+from core.utils.stemming import stem_phrase, stem_token
+
+
+REVIEW_URL_NAME = "customer:attempt_review"
+
+
+# Review page: сұрау саны сұрақ санына тәуелді емес
+# ======================================================================================================================
+@override_settings(MCQ_ANSWER_SOURCE="answer_json")
+class ReviewQueryCountTests(TestCase):
+    # sections, section_attempts, сұрақ саны, current_qas, options, speaking rubrics, speaking answers,
+    # writing expected_output, writing submissions + шаблондағы attempt.user
+    EXPECTED_QUERIES = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="student", password="pass", iin="000000000001")
+
+    def _make_attempt(self, question_count: int) -> ExamAttempt:
+        exam = Exam.objects.create(title=f"Exam {question_count}")
+        section = Section.objects.create(exam=exam, section_type=Section.SectionType.READING, max_score=question_count)
+        material = SectionMaterial.objects.create(section=section, text="Reading passage")
+
+        attempt = ExamAttempt.objects.create(user=self.user, exam=exam, status=AttemptStatus.FINISHED)
+        sa = SectionAttempt.objects.create(attempt=attempt, section=section, status=AttemptStatus.FINISHED)
+
+        for i in range(question_count):
+            q = Question.objects.create(
+                section=section, section_material=material,
+                question_type=Question.QuestionType.MCQ_SINGLE, prompt=f"Question {i}", order=i,
+            )
+            correct = Option.objects.create(question=q, text="A", is_correct=True)
+            wrong = Option.objects.create(question=q, text="B")
+            QuestionAttempt.objects.create(
+                section_attempt=sa, question=q, section_material=material, order=i,
+                option_order=[wrong.pk, correct.pk],
+                answer_json={"type": "mcq_single", "selected_option_ids": [correct.pk]},
+                score=Decimal("1"), max_score=Decimal("1"), is_answered=True, is_graded=True,
+            )
+
+        # әр түрдің өз сұрауы бар: айтылым мен жазылым сұрақтары да есепке кіреді
+        speaking = Question.objects.create(
+            section=section, section_material=material,
+            question_type=Question.QuestionType.SPEAKING_KEYWORDS, prompt="Speak", order=question_count,
+        )
+        SpeakingRubric.objects.create(question=speaking, keywords=["желі", "кесте"])
+        speaking_qa = QuestionAttempt.objects.create(
+            section_attempt=sa, question=speaking, section_material=material, order=question_count,
+            answer_json={"transcript": "желілер", "matched_keywords": ["желі"]},
+            score=Decimal("3"), max_score=Decimal("25"), is_answered=True, is_graded=True,
+        )
+        SpeakingAnswer.objects.create(
+            question_attempt=speaking_qa, transcript="желілер", matched_keywords=["желі"], matched_count=1,
+        )
+
+        writing = Question.objects.create(
+            section=section, section_material=material,
+            question_type=Question.QuestionType.WRITING, prompt="Write", order=question_count + 1,
+        )
+        Writing.objects.create(question=writing, expected_output="4")
+        cases = [
+            WritingTestCase.objects.create(question=writing, stdin=str(i), expected_output=str(i * 2), order=i)
+            for i in (1, 2)
+        ]
+        writing_qa = QuestionAttempt.objects.create(
+            section_attempt=sa, question=writing, section_material=material, order=question_count + 1,
+            answer_json={"credit": "0.5"},
+            score=Decimal("1"), max_score=Decimal("2"), is_answered=True, is_graded=True,
+        )
+        WritingSubmission.objects.create(
+            question_attempt=writing_qa, code="print(int(input()) * 2)", run_status="ok", run_time_ms=12,
+            case_results=[
+                {"id": case.pk, "status": "ok", "passed": i == 0, "time_ms": 12, "weight": 1, "hidden": True}
+                for i, case in enumerate(cases)
+            ],
+        )
+
+        # view-дағы load_attempt_for_user сияқты
+        return ExamAttempt.objects.select_related("exam").get(pk=attempt.pk)
+
+    def _render_review(self, attempt: ExamAttempt) -> str:
+        ctx = _build_review_context(attempt, None, REVIEW_URL_NAME, grading_pending=False)
+        return render_to_string("app/main/attempt/partials/review_body.html", ctx)
+
+    def test_query_count_is_fixed(self):
+        for question_count in (3, 10):
+            with self.subTest(question_count=question_count):
+                attempt = self._make_attempt(question_count)
+                with self.assertNumQueries(self.EXPECTED_QUERIES):
+                    body = self._render_review(attempt)
+                self.assertEqual(body.count("Question "), question_count)
+                self.assertIn("желілер", body)
+                self.assertIn("print(int(input()) * 2)", body)
+
+    def test_section_material_is_rendered(self):
+        attempt = self._make_attempt(3)
+        ctx = _build_review_context(attempt, None, REVIEW_URL_NAME, grading_pending=False)
+
+        self.assertEqual(ctx["current_material"].text, "Reading passage")
+        self.assertIn("Reading passage", self._render_review(attempt))
+
+
+# Exam content_version: мазмұн өзгерсе blueprint/answer key кэші ескіреді
+# ======================================================================================================================
+class ExamContentVersionTests(TestCase):
+    def _version(self, exam: Exam) -> int:
+        exam.refresh_from_db(fields=["content_version"])
+        return exam.content_version
+
+    def test_moving_question_bumps_both_exams(self):
+        old_exam = Exam.objects.create(title="Old")
+        new_exam = Exam.objects.create(title="New")
+        old_section = Section.objects.create(exam=old_exam, section_type=Section.SectionType.READING)
+        new_section = Section.objects.create(exam=new_exam, section_type=Section.SectionType.READING)
+        question = Question.objects.create(
+            section=old_section, question_type=Question.QuestionType.MCQ_SINGLE, prompt="Question",
+        )
+        before = self._version(old_exam), self._version(new_exam)
+
+        question.section = new_section
+        question.save()
+
+        self.assertGreater(self._version(old_exam), before[0])
+        self.assertGreater(self._version(new_exam), before[1])
+
+
+# Stemming: бір түбірге түсетін формалар және соқтығыспайтын қысқа түбірлер
+# ======================================================================================================================
+class StemmingTests(SimpleTestCase):
+    def assertSameStem(self, *words):
+        self.assertEqual(len({stem_token(w) for w in words}), 1, {w: stem_token(w) for w in words})
+
+    def test_inflected_forms_share_stem(self):
+        self.assertSameStem("желі", "желілер", "желілерде", "желілерінде")
+        self.assertSameStem("кесте", "кестелер", "кестеде")
+        self.assertSameStem("деректер", "деректерді")
+        self.assertSameStem("компьютер", "компьютерлер", "компьютерді")
+        self.assertSameStem("алгоритм", "алгоритмы", "алгоритмами")
+
+    def test_short_roots_and_loanwords_share_stem(self):
+        self.assertSameStem("кодты", "код")
+        self.assertSameStem("торда", "тор")
+        self.assertSameStem("объектілер", "объект")
+        self.assertSameStem("сети", "сеть")
+
+    def test_short_stems_do_not_collide(self):
+        self.assertEqual(stem_token("желі"), "желі")
+        self.assertNotEqual(stem_token("желі"), stem_token("жел"))
+        self.assertNotEqual(stem_token("кесте"), stem_token("кесу"))
+
+    def test_stem_matcher_gives_no_false_credit(self):
+        keywords = ["желі", "кесте"]
+        matcher = KeywordMatcher(keywords, phrases=[stem_phrase(k).split() for k in keywords], stem=True)
+
+        self.assertEqual(matcher.match("жел соқты, қағазды кесу керек"), [])
+        self.assertEqual(matcher.match("желілерде деректер кестеде сақталады"), keywords)
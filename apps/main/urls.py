@@ -26,6 +26,9 @@ urlpatterns = [
     # HTMX save (question_id URL-да!)
     path("attempts/<int:attempt_id>/q/<int:question_id>/answer/", attempt.attempt_answer_view, name="attempt_answer"),
 
+    # JSON autosave (MCQ, batch)
+    path("attempts/<int:attempt_id>/autosave/", attempt.attempt_autosave_view, name="attempt_autosave"),
+
     path("attempts/<int:attempt_id>/q/<int:question_id>/speaking/", attempt.attempt_speaking_upload_view,
          name="attempt_speaking_upload"),
     path("attempts/<int:attempt_id>/q/<int:question_id>/writing/", attempt.attempt_writing_submit_view,
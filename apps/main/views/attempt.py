@@ -1,15 +1,20 @@
+import json
+from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.http import HttpResponse, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
+from apps.main.services.grading import audio_content_hash
+from apps.main.services.plan import get_answered_q_ids, get_attempt_plan, mark_answered
 from apps.main.services.review import _build_review_response
 from core.utils.decorators import role_required
 from django.views.decorators.http import require_GET, require_POST
 from apps.main.services.attempt import ensure_attempt_initialized, save_mcq_answer_only, load_attempt_for_user, \
-    is_hx, finish_attempt_auto, build_attempt_question_context, grade_pending_open_questions
-from core.models import AttemptStatus, QuestionAttempt, SpeakingAnswer, WritingSubmission
+    is_hx, finish_attempt_auto, build_attempt_question_context, grade_pending_open_questions, apply_mcq_autosave, \
+    AttemptNotInProgress
+from core.models import AttemptStatus, QuestionAttempt, SpeakingAnswer, Writing, WritingSubmission
 
 
 # attempt detail redirect
@@ -23,22 +28,16 @@ def attempt_detail_view(request, attempt_id: int):
     if attempt.status in (AttemptStatus.FINISHED, AttemptStatus.ABORTED):
         return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
-    qa_qs = (
-        QuestionAttempt.objects
-        .filter(section_attempt__attempt=attempt)
-        .only("question_id", "is_answered", "order")
-        .order_by("order", "id")
-    )
-    ordered_q_ids = [qa.question_id for qa in qa_qs]
-    if not ordered_q_ids:
+    plan = get_attempt_plan(attempt)
+    if not plan:
         return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
-    answered_q_ids = {qa.question_id for qa in qa_qs if qa.is_answered}
     q_param = request.GET.get("q")
-    if q_param and q_param.isdigit() and int(q_param) in ordered_q_ids:
+    if q_param and q_param.isdigit() and any(item.question_id == int(q_param) for item in plan):
         qid = int(q_param)
     else:
-        qid = next((x for x in ordered_q_ids if x not in answered_q_ids), ordered_q_ids[0])
+        answered_q_ids = get_answered_q_ids(attempt, plan)
+        qid = next((item.question_id for item in plan if item.question_id not in answered_q_ids), plan[0].question_id)
 
     url = reverse("customer:attempt_question", args=[attempt.pk])
     return redirect(f"{url}?q={qid}")
@@ -108,24 +107,28 @@ def attempt_answer_view(request, attempt_id: int, question_id: int):
         raw = request.POST.getlist("options")
         selected_ids = [int(x) for x in raw if x and str(x).isdigit()]
 
-    save_mcq_answer_only(qa, selected_ids)
+    # autosave скрипті қосатын реттік нөмір (JS жоқ болса — None)
+    raw_seq = request.POST.get("seq")
+    seq = int(raw_seq) if raw_seq and raw_seq.isdigit() else None
+
+    try:
+        save_mcq_answer_only(qa, selected_ids, seq)
+    except AttemptNotInProgress:
+        return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
+    plan = get_attempt_plan(attempt)
+    plan_q_ids = [item.question_id for item in plan]
     next_q_param = request.POST.get("next_q_id")
     next_q_id: int | None = None
 
     if next_q_param and str(next_q_param).isdigit():
         cand = int(next_q_param)
-        if QuestionAttempt.objects.filter(section_attempt__attempt=attempt, question_id=cand).exists():
+        if cand in plan_q_ids:
             next_q_id = cand
 
     if next_q_id is None:
-        next_qa = (
-            QuestionAttempt.objects
-            .filter(section_attempt__attempt=attempt, order__gt=qa.order)
-            .order_by("order", "id")
-            .first()
-        )
-        next_q_id = next_qa.question_id if next_qa else qa.question_id
+        idx = plan_q_ids.index(qa.question_id) if qa.question_id in plan_q_ids else -1
+        next_q_id = plan_q_ids[idx + 1] if 0 <= idx < len(plan_q_ids) - 1 else qa.question_id
 
     ctx = build_attempt_question_context(attempt, next_q_id)
     if not ctx:
@@ -143,6 +146,32 @@ def attempt_answer_view(request, attempt_id: int, question_id: int):
     return resp
 
 
+# AUTOSAVE (JSON batch)
+# ======================================================================================================================
+@require_POST
+@role_required("customer")
+def attempt_autosave_view(request, attempt_id: int):
+    attempt = load_attempt_for_user(request, attempt_id)
+    if attempt.status != AttemptStatus.IN_PROGRESS:
+        return HttpResponse(status=409)
+
+    try:
+        payload = json.loads(request.body)
+        seq = int(payload["seq"])
+        changes = {int(qid): [int(oid) for oid in ids] for qid, ids in payload["answers"].items()}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return HttpResponseBadRequest("Invalid autosave payload")
+
+    try:
+        apply_mcq_autosave(attempt, changes, seq)
+    except AttemptNotInProgress:
+        return HttpResponse(status=409)
+    except ValidationError as e:
+        return HttpResponseBadRequest("; ".join(e.messages))
+
+    return HttpResponse(status=204)
+
+
 # SPEAKING UPLOAD
 # ======================================================================================================================
 @require_POST
@@ -182,16 +211,18 @@ def attempt_speaking_upload_view(request, attempt_id: int, question_id: int):
 
     sa, _ = SpeakingAnswer.objects.get_or_create(question_attempt=qa)
     sa.audio = audio_file
+    sa.audio_sha256 = audio_content_hash(audio_file)
     sa.transcript = ""
     sa.matched_keywords = []
     sa.matched_count = 0
-    sa.save(update_fields=["audio", "transcript", "matched_keywords", "matched_count"])
+    sa.save(update_fields=["audio", "audio_sha256", "transcript", "matched_keywords", "matched_count"])
 
     qa.is_answered = True
     qa.is_graded = False
     qa.score = 0
     qa.answer_json = {"type": "speaking_keywords", "submitted": True}
     qa.save(update_fields=["is_answered", "is_graded", "score", "answer_json"])
+    mark_answered(attempt.pk)
 
     if is_hx(request):
         ctx = build_attempt_question_context(attempt, q.id)
@@ -234,22 +265,33 @@ def attempt_writing_submit_view(request, attempt_id: int, question_id: int):
 
         return redirect("customer:attempt_question", attempt_id=attempt.pk)
 
-    output_text = (request.POST.get("output_text") or "").strip()
+    requires_code = bool(
+        Writing.objects.filter(question_id=qa.question_id).values_list("requires_code", flat=True).first()
+    )
     code_text = request.POST.get("code") or ""
-
-    if not output_text and not code_text:
+    # код талап етілетін есепте қолмен енгізілген output қабылданбайды
+    output_text = "" if requires_code else (request.POST.get("output_text") or "").strip()
+    language = request.POST.get("language") or WritingSubmission.Language.PYTHON
+
+    if language not in WritingSubmission.Language.values:
+        return HttpResponseBadRequest("Unknown language")
+    if requires_code and not code_text.strip():
+        return HttpResponseBadRequest("Code is required")
+    if not output_text and not code_text.strip():
         return HttpResponseBadRequest("Empty submission")
 
     sub, _ = WritingSubmission.objects.get_or_create(question_attempt=qa)
+    sub.language = language
     sub.code = code_text
     sub.output_text = output_text
-    sub.save(update_fields=["code", "output_text"])
+    sub.save(update_fields=["language", "code", "output_text"])
 
     qa.is_answered = True
     qa.is_graded = False
     qa.score = 0
     qa.answer_json = {"type": "writing", "submitted": True}
     qa.save(update_fields=["is_answered", "is_graded", "score", "answer_json"])
+    mark_answered(attempt.pk)
 
     if is_hx(request):
         ctx = build_attempt_question_context(attempt, qa.question_id)
@@ -274,8 +316,8 @@ def attempt_submit_view(request, attempt_id: int):
     if attempt.status != AttemptStatus.IN_PROGRESS:
         return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
-    grade_pending_open_questions(attempt)
     finish_attempt_auto(attempt)
+    grade_pending_open_questions(attempt)
     return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
 
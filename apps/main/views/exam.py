@@ -1,12 +1,13 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import OuterRef, Exists, Prefetch, Subquery, IntegerField, Value, F, ExpressionWrapper, FloatField
-from django.db.models.aggregates import Avg, Count, Sum
-from django.db.models.functions import Coalesce, Cast, NullIf
+from django.db.models import OuterRef, Exists, Prefetch, Subquery, IntegerField, Value
+from django.db.models.aggregates import Count, Sum
+from django.db.models.functions import Coalesce
 from django.shortcuts import render, get_object_or_404, redirect
 from django.utils import timezone
+from apps.main.services.stats import get_user_score_averages
 from core.utils.decorators import role_required
-from core.models import ExamAttempt, SectionAttempt, Exam, Section, Question, AttemptStatus
+from core.models import ExamAttempt, Exam, Section, Question, AttemptStatus, STAT_TOTAL
 
 
 # customer dashboard page
@@ -22,35 +23,9 @@ def customer_dashboard_view(request):
         .filter(user=user)
         .order_by("-finished_at", "-pk")[:10]
     )
-    overall_avg = (
-        ExamAttempt.objects
-        .filter(user=user)
-        .exclude(total_score__isnull=True)
-        .exclude(max_total_score__isnull=True)
-        .annotate(
-            percent=ExpressionWrapper(
-                Cast(F("total_score"), FloatField()) * Value(100.0) / NullIf(Cast(F("max_total_score"), FloatField()), 0.0),
-                output_field=FloatField(),
-            )
-        )
-        .aggregate(avg=Avg("percent"))
-        .get("avg")
-    )
-    section_avg_qs = (
-        SectionAttempt.objects
-        .filter(attempt__user=user)
-        .exclude(score__isnull=True)
-        .exclude(max_score__isnull=True)
-        .annotate(
-            percent=ExpressionWrapper(
-                Cast(F("score"), FloatField()) * Value(100.0) / NullIf(Cast(F("max_score"), FloatField()), 0.0),
-                output_field=FloatField(),
-            )
-        )
-        .values("section__section_type")
-        .annotate(avg=Avg("percent"))
-    )
-    section_avg_s = {row["section__section_type"]: row["avg"] for row in section_avg_qs}
+    # аяқталған нәтижелер бойынша алдын ала жинақталған орташа пайыздар
+    section_avg_s = get_user_score_averages(user.pk)
+    overall_avg = section_avg_s.get(STAT_TOTAL)
 
     SECTION_KEYS = [
         ("listening", "Тыңдалым (Listening)"),
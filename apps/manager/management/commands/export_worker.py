@@ -0,0 +1,31 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from apps.manager.services.export import claim_export_jobs, purge_expired_exports, run_export_job
+
+
+class Command(BaseCommand):
+    help = "Менеджер экспорттарын (xlsx/csv) фондық режимде құру (DB кезегі)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll-interval", type=float, default=2.0)
+        parser.add_argument("--once", action="store_true", help="Кезекті бір рет өңдеп, шығу.")
+
+    def handle(self, *args, **opts):
+        self.stdout.write("export worker started")
+        while True:
+            close_old_connections()
+            job_ids = claim_export_jobs(limit=1)
+
+            if job_ids:
+                for job_id in job_ids:
+                    self.stdout.write(f"export #{job_id}: {run_export_job(job_id)}")
+                continue
+
+            purged = purge_expired_exports()
+            if purged:
+                self.stdout.write(f"{purged} expired export(s) removed")
+
+            if opts["once"]:
+                break
+            time.sleep(opts["poll_interval"])
@@ -0,0 +1,247 @@
+import csv
+import hashlib
+import json
+import secrets
+import tempfile
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+from openpyxl import Workbook
+from apps.manager.services.search import search_attempts
+from core.models import AttemptStatus, ExamAttempt, ExportJob, JobStatus, Section
+
+
+EXPORT_CHUNK_SIZE = 2000
+STALE_LOCK_SECONDS = 60 * 10
+
+# секция баллдары бөлек бағандарда (дашбордтағы реттілікпен)
+EXPORT_SECTION_TYPES = (
+    Section.SectionType.LISTENING,
+    Section.SectionType.READING,
+    Section.SectionType.SPEAKING,
+    Section.SectionType.WRITING,
+)
+
+EXPORT_HEADER = [
+    "ID",
+    "Студент",
+    "Емтихан",
+    "Статус",
+    "Жалпы балл",
+    "Макс. балл",
+    "Пайыздық көрсеткіші",
+    *(str(section_type.label) for section_type in EXPORT_SECTION_TYPES),
+    "Басталған уақыты",
+    "Аяқталған уақыты",
+]
+
+EXPORT_FIELDS = (
+    "id",
+    "user__first_name",
+    "user__last_name",
+    "exam__title",
+    "status",
+    "total_score",
+    "max_total_score",
+    "started_at",
+    "finished_at",
+)
+
+
+# filter_attempts: менеджер панеліндегі сүзгілер (тізім де, экспорт та осыны қолданады)
+def filter_attempts(qs, q: str = "", status: str = "", exam_id: str = ""):
+    if status:
+        qs = qs.filter(status=status)
+
+    if exam_id:
+        qs = qs.filter(exam_id=exam_id)
+
+    if q:
+        qs = search_attempts(qs, q)
+    return qs
+
+
+def export_queryset(q: str = "", status: str = "", exam_id: str = ""):
+    return filter_attempts(ExamAttempt.objects.all(), q, status, exam_id).filter(status=AttemptStatus.FINISHED)
+
+
+# section_score_columns: SectionAttempt баллдарын сол сұраныстың ішінде шартты агрегациямен бағандарға бұру
+def section_score_columns() -> dict:
+    return {
+        f"{section_type}_score": Sum(
+            "section_attempts__score",
+            filter=Q(section_attempts__section__section_type=section_type),
+        )
+        for section_type in EXPORT_SECTION_TYPES
+    }
+
+
+# iter_export_rows: модель объектілерін құрмай, бөліктеп оқылатын жолдар
+def iter_export_rows(qs, chunk_size: int = EXPORT_CHUNK_SIZE):
+    status_labels = dict(AttemptStatus.choices)
+    section_columns = section_score_columns()
+    rows = (
+        qs
+        .annotate(**section_columns)
+        .order_by("id")
+        .values_list(*EXPORT_FIELDS, *section_columns)
+        .iterator(chunk_size=chunk_size)
+    )
+    for pk, first_name, last_name, exam_title, status, total, max_total, started_at, finished_at, *sections in rows:
+        percent = 0
+        if max_total:
+            percent = round((total / max_total) * 100, 2)
+        yield [
+            pk,
+            f"{first_name} {last_name}",
+            exam_title,
+            status_labels.get(status, status),
+            total,
+            max_total,
+            percent,
+            *sections,
+            str(started_at),
+            str(finished_at),
+        ]
+
+
+# CSV: csv.writer жазған жолды бірден қайтаратын буфер (write_csv файлға жол-жолымен жазады)
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    # Excel UTF-8 CSV-ді дұрыс ашуы үшін BOM
+    yield "\ufeff" + writer.writerow(EXPORT_HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_csv(rows, fileobj) -> None:
+    for line in stream_csv(rows):
+        fileobj.write(line.encode("utf-8"))
+
+
+# XLSX: write-only режимде жолдар жадта жиналмай, уақытша файлға жазылады
+def write_xlsx(rows, fileobj) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Емтихан нәтижелері")
+    ws.append(EXPORT_HEADER)
+    for row in rows:
+        ws.append(row)
+    wb.save(fileobj)
+
+
+WRITERS = {
+    ExportJob.Format.XLSX: write_xlsx,
+    ExportJob.Format.CSV: write_csv,
+}
+
+
+# ======================================================================================================================
+# Export jobs: файл фондық worker-де құрылады, web worker тек кезекке қояды
+# ======================================================================================================================
+def export_filters(q: str = "", status: str = "", exam_id: str = "") -> dict:
+    return {"q": q, "status": status, "exam": exam_id}
+
+
+def export_filters_hash(filters: dict) -> str:
+    return hashlib.sha256(json.dumps(filters, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# request_export: сол сүзгілермен жуырда құрылған (немесе әлі құрылып жатқан) файл қайта қолданылады
+def request_export(user, filters: dict, fmt: str) -> ExportJob:
+    filters_hash = export_filters_hash(filters)
+    fresh_since = timezone.now() - timedelta(seconds=settings.EXPORT_FRESHNESS_SECONDS)
+    job = (
+        ExportJob.objects
+        .filter(filters_hash=filters_hash, fmt=fmt)
+        .filter(
+            Q(status__in=[JobStatus.PENDING, JobStatus.RUNNING]) |
+            Q(status=JobStatus.DONE, finished_at__gte=fresh_since)
+        )
+        .order_by("-created_at")
+        .first()
+    )
+    if job:
+        return job
+    return ExportJob.objects.create(requested_by=user, fmt=fmt, filters=filters, filters_hash=filters_hash)
+
+
+# claim_export_jobs
+@transaction.atomic
+def claim_export_jobs(limit: int) -> list[int]:
+    now = timezone.now()
+    stale = now - timedelta(seconds=STALE_LOCK_SECONDS)
+    ids = list(
+        ExportJob.objects
+        .select_for_update(skip_locked=True)
+        .filter(
+            Q(status=JobStatus.PENDING) |
+            Q(status=JobStatus.RUNNING, locked_at__lt=stale)
+        )
+        .order_by("created_at", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    if ids:
+        ExportJob.objects.filter(pk__in=ids).update(status=JobStatus.RUNNING, locked_at=now, updated_at=now)
+    return ids
+
+
+def _track_progress(job_id: int, rows, every: int = EXPORT_CHUNK_SIZE):
+    done = 0
+    for row in rows:
+        yield row
+        done += 1
+        if done % every == 0:
+            # locked_at жаңартылады: ұзақ экспортты басқа worker stale деп алып кетпейді
+            now = timezone.now()
+            ExportJob.objects.filter(pk=job_id).update(done_rows=done, locked_at=now, updated_at=now)
+
+
+# run_export_job
+def run_export_job(job_id: int) -> str:
+    job = ExportJob.objects.get(pk=job_id)
+    filters = job.filters or {}
+    qs = export_queryset(filters.get("q", ""), filters.get("status", ""), filters.get("exam", ""))
+
+    try:
+        job.total_rows = qs.count()
+        job.done_rows = 0
+        job.save(update_fields=["total_rows", "done_rows", "updated_at"])
+
+        with tempfile.TemporaryFile() as tmp:
+            WRITERS[job.fmt](_track_progress(job.pk, iter_export_rows(qs)), tmp)
+            tmp.seek(0)
+            # /media/ ашық беріледі, сондықтан файл аты болжанбайтын болуы керек
+            job.file.save(f"{secrets.token_hex(16)}.{job.fmt}", File(tmp), save=False)
+    except Exception as exc:
+        job.status = JobStatus.FAILED
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        job.locked_at = None
+        job.save(update_fields=["status", "last_error", "locked_at", "updated_at"])
+        return job.status
+
+    job.status = JobStatus.DONE
+    job.done_rows = job.total_rows
+    job.locked_at = None
+    job.finished_at = timezone.now()
+    job.last_error = ""
+    job.save(update_fields=["status", "file", "done_rows", "locked_at", "finished_at", "last_error", "updated_at"])
+    return job.status
+
+
+# purge_expired_exports: ескі файлдар мен жазбаларды тазалау
+def purge_expired_exports() -> int:
+    cutoff = timezone.now() - timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+    jobs = list(ExportJob.objects.filter(created_at__lt=cutoff).exclude(status=JobStatus.RUNNING))
+    for job in jobs:
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+    return len(jobs)
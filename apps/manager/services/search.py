@@ -0,0 +1,24 @@
+from django.db.models import Q
+from core.models import Exam, User
+
+
+# PostgreSQL bigint шегі: одан үлкен сан ID бола алмайды
+MAX_ATTEMPT_ID = 2 ** 63 - 1
+
+
+# search_attempts: менеджер іздеуі
+# - сан → attempt ID бойынша дәл іздеу (PK индексі)
+# - мәтін → пайдаланушы мен емтихан кестелерінде жеке ішкі сұраныстар; әрқайсысы өз pg_trgm индекстерін қолданады,
+#   ал ExamAttempt user_id/exam_id FK индекстері арқылы сүзіледі
+def search_attempts(qs, q: str):
+    if q.isdigit():
+        attempt_id = int(q)
+        return qs.filter(pk=attempt_id) if attempt_id <= MAX_ATTEMPT_ID else qs.none()
+
+    users = User.objects.filter(
+        Q(username__icontains=q) |
+        Q(first_name__icontains=q) |
+        Q(last_name__icontains=q)
+    ).values("pk")
+    exams = Exam.objects.filter(title__icontains=q).values("pk")
+    return qs.filter(Q(user_id__in=users) | Q(exam_id__in=exams))
@@ -6,4 +6,7 @@ app_name = "manager"
 urlpatterns = [
     path("", views.manager_dashboard_view, name="dashboard"),
     path("attempts/<int:attempt_id>/review/", views.manager_attempt_review_view, name="attempt_review"),
+    path("exports/", views.manager_export_create_view, name="export_create"),
+    path("exports/<int:job_id>/", views.manager_export_status_view, name="export_status"),
+    path("exports/<int:job_id>/download/", views.manager_export_download_view, name="export_download"),
 ]
\ No newline at end of file
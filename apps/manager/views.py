@@ -1,46 +1,20 @@
-import csv
-
 from django.core.paginator import Paginator
-from django.db.models import FloatField, Value, ExpressionWrapper, F, Avg, Q
+from django.db.models import FloatField, Value, ExpressionWrapper, F, Avg
 from django.db.models.functions import Cast, NullIf
-from django.http import HttpResponse
+from django.http import FileResponse, Http404
 from django.shortcuts import render, get_object_or_404
-from django.views.decorators.http import require_GET
-from openpyxl import Workbook
+from django.views.decorators.http import require_GET, require_POST
 
 from apps.main.services.review import _build_review_response
-from core.models import Exam, SectionAttempt, ExamAttempt
+from apps.main.services.stats import get_exam_score_averages
+from apps.manager.services.export import export_filters, filter_attempts, request_export
+from core.models import AttemptStatus, Exam, SectionAttempt, ExamAttempt, ExportJob, JobStatus, STAT_TOTAL
 from core.utils.decorators import role_required
 
 
 # manager_dashboard page
 # ======================================================================================================================
-@role_required('manager')
-def manager_dashboard_view(request):
-    q = request.GET.get("q", "").strip()
-    status = request.GET.get("status", "").strip()
-    exam_id = request.GET.get("exam", "").strip()
-    export = request.GET.get("export", "").strip()
-
-    base_attempts = ExamAttempt.objects.select_related("user", "exam")
-    if status:
-        base_attempts = base_attempts.filter(status=status)
-
-    if exam_id:
-        base_attempts = base_attempts.filter(exam_id=exam_id)
-
-    if q:
-        base_attempts = base_attempts.filter(
-            Q(user__username__icontains=q) |
-            Q(user__first_name__icontains=q) |
-            Q(user__last_name__icontains=q) |
-            Q(exam__title__icontains=q) |
-            Q(id__icontains=q)
-        )
-
-    finished_attempts = base_attempts.filter(status="finished")
-    total_attempts = finished_attempts.count()
-
+def _live_score_averages(finished_attempts) -> dict:
     overall_avg = (
         finished_attempts
         .exclude(total_score__isnull=True)
@@ -57,7 +31,7 @@ def manager_dashboard_view(request):
 
     section_avg_qs = (
         SectionAttempt.objects
-        .filter(attempt__status="finished")
+        .filter(attempt__in=finished_attempts.values("pk"))
         .annotate(
             percent=ExpressionWrapper(
                 Cast(F("score"), FloatField()) * Value(100.0) /
@@ -72,6 +46,29 @@ def manager_dashboard_view(request):
         row["section__section_type"]: row["avg"]
         for row in section_avg_qs
     }
+    section_avg_map[STAT_TOTAL] = overall_avg
+    return section_avg_map
+
+
+@role_required('manager')
+def manager_dashboard_view(request):
+    q = request.GET.get("q", "").strip()
+    status = request.GET.get("status", "").strip()
+    exam_id = request.GET.get("exam", "").strip()
+
+    base_attempts = filter_attempts(ExamAttempt.objects.select_related("user", "exam"), q, status, exam_id)
+
+    finished_attempts = base_attempts.filter(status="finished")
+    total_attempts = finished_attempts.count()
+
+    if q:
+        # еркін мәтін сүзгісін алдын ала жинау мүмкін емес: сүзілген нәтижелер бойынша тікелей есептеледі
+        section_avg_map = _live_score_averages(finished_attempts)
+    elif status and status != AttemptStatus.FINISHED:
+        section_avg_map = {}
+    else:
+        section_avg_map = get_exam_score_averages(exam_id or None)
+    overall_avg = section_avg_map.get(STAT_TOTAL)
 
     SECTION_KEYS = [
         ("listening", "Тыңдалым (Listening)"),
@@ -88,48 +85,6 @@ def manager_dashboard_view(request):
         for key, label in SECTION_KEYS
     ]
 
-    # 🔹 Excel export
-    if export == "xlsx":
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Емтихан нәтижелері"
-
-        ws.append([
-            "ID",
-            "Студент",
-            "Емтихан",
-            "Статус",
-            "Жалпы балл",
-            "Макс. балл",
-            "Пайыздық көрсеткіші",
-            "Басталған уақыты",
-            "Аяқталған уақыты",
-        ])
-
-        for a in finished_attempts:
-            percent = 0
-            if a.max_total_score:
-                percent = round((a.total_score / a.max_total_score) * 100, 2)
-
-            ws.append([
-                a.pk,
-                f'{a.user.first_name} {a.user.last_name}',
-                a.exam.title,
-                a.get_status_display(),
-                a.total_score,
-                a.max_total_score,
-                percent,
-                str(a.started_at),
-                str(a.finished_at),
-            ])
-
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = 'attachment; filename="exam_attempts.xlsx"'
-        wb.save(response)
-        return response
-
     # 🔹 Pagination
     attempts = base_attempts.order_by("-finished_at", "-id")
     paginator = Paginator(attempts, 20)
@@ -156,3 +111,37 @@ def manager_attempt_review_view(request, attempt_id: int):
         pk=attempt_id
     )
     return _build_review_response(request, attempt, review_url_name="manager:attempt_review")
+
+
+# manager export jobs
+# ======================================================================================================================
+@require_POST
+@role_required("manager")
+def manager_export_create_view(request):
+    fmt = request.POST.get("fmt", ExportJob.Format.XLSX)
+    if fmt not in ExportJob.Format.values:
+        fmt = ExportJob.Format.XLSX
+
+    filters = export_filters(
+        q=request.POST.get("q", "").strip(),
+        status=request.POST.get("status", "").strip(),
+        exam_id=request.POST.get("exam", "").strip(),
+    )
+    job = request_export(request.user, filters, fmt)
+    return render(request, "app/manager/partials/export_status.html", {"job": job})
+
+
+@require_GET
+@role_required("manager")
+def manager_export_status_view(request, job_id: int):
+    job = get_object_or_404(ExportJob, pk=job_id)
+    return render(request, "app/manager/partials/export_status.html", {"job": job})
+
+
+@require_GET
+@role_required("manager")
+def manager_export_download_view(request, job_id: int):
+    job = get_object_or_404(ExportJob, pk=job_id, status=JobStatus.DONE)
+    if not job.file:
+        raise Http404()
+    return FileResponse(job.file.open("rb"), as_attachment=True, filename=f"exam_attempts_{job.pk}.{job.fmt}")
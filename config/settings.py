@@ -84,6 +84,28 @@ DATABASES = {
 }
 
 
+# CACHE
+# ----------------------------------------------------------------------------------------------------------------------
+# кэш барлық процестерге (gunicorn workers, grading/export worker) ортақ болуы керек: әдепкіде DB кестесі
+# (migrate кезінде құрылады), жүктеме өссе — django.core.cache.backends.redis.RedisCache.
+# LocMemCache тек DEBUG режимінде рұқсат (apps.main.checks)
+CACHE_BACKEND = config("CACHE_BACKEND", default="django.core.cache.backends.db.DatabaseCache")
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": config("CACHE_LOCATION", default="csgrade_cache"),
+    }
+}
+# DatabaseCache әдепкіде 300 жазбадан кейін тазаланады (cull). Бір attempt-ке ~3 кілт (жоспар, answered жиыны
+# мен токені) + бөлім саны бойынша review беттері, бір емтиханға ~3 кілт (нұсқа, blueprint, answer key):
+# жүздеген қатар тапсырушыға 100 000 шегі жеткілікті, cull болса жазбалардың тек 1/10 бөлігі өшеді
+if CACHE_BACKEND == "django.core.cache.backends.db.DatabaseCache":
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": config("CACHE_MAX_ENTRIES", default=100_000, cast=int),
+        "CULL_FREQUENCY": config("CACHE_CULL_FREQUENCY", default=10, cast=int),
+    }
+
+
 # Password validation
 # ----------------------------------------------------------------------------------------------------------------------
 AUTH_PASSWORD_VALIDATORS = [
@@ -220,3 +242,46 @@ CKEDITOR_CONFIGS = {
 
 
 OPENAI_API_KEY = config("OPENAI_API_KEY")
+
+
+# Grading worker settings
+# ----------------------------------------------------------------------------------------------------------------------
+SPEAKING_TRANSCRIBER = config("SPEAKING_TRANSCRIBER", default="apps.main.services.speaking.transcribe_audio")
+GRADING_WORKER_THREADS = config("GRADING_WORKER_THREADS", default=4, cast=int)
+GRADING_MAX_ATTEMPTS = config("GRADING_MAX_ATTEMPTS", default=5, cast=int)
+
+
+# Export worker settings (менеджер экспорттары MEDIA_ROOT/exports/ ішінде)
+# ----------------------------------------------------------------------------------------------------------------------
+EXPORT_FRESHNESS_SECONDS = config("EXPORT_FRESHNESS_SECONDS", default=60 * 10, cast=int)
+EXPORT_RETENTION_HOURS = config("EXPORT_RETENTION_HOURS", default=24, cast=int)
+
+
+# Answer storage
+# ----------------------------------------------------------------------------------------------------------------------
+# "answer_json" — MCQ жауаптары QuestionAttempt.answer_json-нан оқылады, "table" — MCQSelection кестесінен
+MCQ_ANSWER_SOURCE = config("MCQ_ANSWER_SOURCE", default="answer_json")
+
+
+# Sandbox settings (жазбаша жауаптардың кодын орындау)
+# ----------------------------------------------------------------------------------------------------------------------
+SANDBOX_WORKERS = config("SANDBOX_WORKERS", default=0, cast=int)
+SANDBOX_CPU_SECONDS = config("SANDBOX_CPU_SECONDS", default=2, cast=int)
+SANDBOX_WALL_SECONDS = config("SANDBOX_WALL_SECONDS", default=5.0, cast=float)
+SANDBOX_MEMORY_MB = config("SANDBOX_MEMORY_MB", default=256, cast=int)
+SANDBOX_OUTPUT_KB = config("SANDBOX_OUTPUT_KB", default=1024, cast=int)
+SANDBOX_CACHE_DIR = config("SANDBOX_CACHE_DIR", default=str(BASE_DIR / ".sandbox"))
+# RLIMIT_NPROC: sandbox uid-і ортақ, сондықтан шек бір уақыттағы барлық орындауға (және worker-дің өзіне) бірге
+# қолданылады. Бір орындаудың ағын саны: python, cpp — 1; node — ~11; java, javac — CPU санына қарай 20-50.
+# Шамамен SANDBOX_WORKERS × 64 + қор болуы керек, әйтпесе JVM "unable to create native thread" деп құлайды
+SANDBOX_MAX_PROCESSES = config("SANDBOX_MAX_PROCESSES", default=1024, cast=int)
+# компиляция кэші (<SANDBOX_CACHE_DIR>/csgrade-sandbox/<lang>/<sha256>) grading worker бос кезде тазаланады
+SANDBOX_COMPILE_CACHE_HOURS = config("SANDBOX_COMPILE_CACHE_HOURS", default=24 * 7, cast=int)
+SANDBOX_COMPILE_CACHE_MB = config("SANDBOX_COMPILE_CACHE_MB", default=1024, cast=int)
+# "bwrap" — bubblewrap (бос read-only түбір, желі жоқ, nobody uid); "none" тек DEBUG=True кезінде рұқсат
+SANDBOX_ISOLATION = config("SANDBOX_ISOLATION", default="bwrap")
+SANDBOX_RO_PATHS = config(
+    "SANDBOX_RO_PATHS",
+    default="/usr,/bin,/lib,/lib32,/lib64,/etc/alternatives,/etc/ld.so.cache,/etc/ld.so.conf,/etc/ld.so.conf.d",
+    cast=lambda v: [p.strip() for p in v.split(",") if p.strip()],
+)
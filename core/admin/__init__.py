@@ -1,3 +1,4 @@
 from .accounts import *
 from .exams import *
-from .attempts import *
\ No newline at end of file
+from .attempts import *
+from .jobs import *
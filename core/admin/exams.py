@@ -4,7 +4,7 @@ from django.utils.safestring import mark_safe
 from core.admin._mixins import LinkedAdminMixin
 from core.forms.exams import ExamAdminForm, SectionMaterialAdminForm, QuestionAdminForm, OptionAdminForm, \
     SpeakingRubricAdminForm
-from core.models import Exam, Section, SectionMaterial, Question, Option, SpeakingRubric, Writing
+from core.models import Exam, Section, SectionMaterial, Question, Option, SpeakingRubric, Writing, WritingTestCase
 from django.utils.translation import gettext_lazy as _
 
 
@@ -142,6 +142,12 @@ class WritingInline(admin.StackedInline):
     extra = 0
 
 
+# WritingTestCaseInline
+class WritingTestCaseInline(admin.TabularInline):
+    model = WritingTestCase
+    extra = 0
+
+
 # QuestionAdmin
 @admin.register(Question)
 class QuestionAdmin(LinkedAdminMixin, admin.ModelAdmin):
@@ -160,7 +166,7 @@ class QuestionAdmin(LinkedAdminMixin, admin.ModelAdmin):
         return self.parent_link(obj, "section")
     section_link.short_description = _("Секция")
 
-    inlines = (OptionInline, WritingInline, SpeakingRubricInline, )
+    inlines = (OptionInline, WritingInline, WritingTestCaseInline, SpeakingRubricInline, )
 
     def get_inline_instances(self, request, obj=None):
         inline_instances = super().get_inline_instances(request, obj)
@@ -177,5 +183,6 @@ class QuestionAdmin(LinkedAdminMixin, admin.ModelAdmin):
             allowed.add(SpeakingRubricInline)
         if qt == Question.QuestionType.WRITING:
             allowed.add(WritingInline)
+            allowed.add(WritingTestCaseInline)
 
         return [inl for inl in inline_instances if inl.__class__ in allowed]
@@ -0,0 +1,27 @@
+from django.contrib import admin
+from core.admin._mixins import LinkedAdminMixin
+from core.models import ExportJob, GradingJob
+from django.utils.translation import gettext_lazy as _
+
+
+# ======================================================================================================================
+# Jobs
+# ======================================================================================================================
+# GradingJobAdmin
+@admin.register(GradingJob)
+class GradingJobAdmin(LinkedAdminMixin, admin.ModelAdmin):
+    list_display = ("pk", "kind", "status", "attempts", "run_after", "updated_at", )
+    list_filter = ("status", "kind")
+    readonly_fields = ("question_attempt_link", )
+
+    def question_attempt_link(self, obj):
+        return self.parent_link(obj, "question_attempt")
+    question_attempt_link.short_description = _("Сұрақ нәтижесі")
+
+
+# ExportJobAdmin
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("pk", "fmt", "status", "done_rows", "total_rows", "requested_by", "created_at", "finished_at", )
+    list_filter = ("status", "fmt")
+    readonly_fields = ("filters_hash", )
@@ -62,7 +62,7 @@ class SpeakingRubricAdminForm(forms.ModelForm):
 
     class Meta:
         model = SpeakingRubric
-        fields = ("question", "keywords_text", "point_per_keyword", "max_points")
+        fields = ("question", "keywords_text", "use_stemming", "point_per_keyword", "max_points")
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
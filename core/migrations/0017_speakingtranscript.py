@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-16 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_gradingjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='speakinganswer',
+            name='audio_sha256',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64, verbose_name='Аудио хэші'),
+        ),
+        migrations.CreateModel(
+            name='SpeakingTranscript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='Аудио хэші')),
+                ('model_name', models.CharField(max_length=128, verbose_name='Модель')),
+                ('transcript', models.TextField(blank=True, default='', verbose_name='Транскрипт')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Құрылған уақыты')),
+            ],
+            options={
+                'verbose_name': 'Транскрипт кэші',
+                'verbose_name_plural': 'Транскрипт кэштері',
+                'constraints': [models.UniqueConstraint(fields=('content_hash', 'model_name'), name='uniq_transcript_per_hash_model')],
+            },
+        ),
+    ]
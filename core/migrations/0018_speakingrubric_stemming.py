@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-16 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_speakingtranscript'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='speakingrubric',
+            name='keyword_stems',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Кілттік сөз түбірлері'),
+        ),
+        migrations.AddField(
+            model_name='speakingrubric',
+            name='use_stemming',
+            field=models.BooleanField(default=False, verbose_name='Сөз формаларын ескеру'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-16 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_speakingrubric_stemming'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='writingsubmission',
+            name='run_output',
+            field=models.TextField(blank=True, default='', verbose_name='Бағдарлама шығысы'),
+        ),
+        migrations.AddField(
+            model_name='writingsubmission',
+            name='run_status',
+            field=models.CharField(blank=True, default='', max_length=32, verbose_name='Орындау статусы'),
+        ),
+        migrations.AddField(
+            model_name='writingsubmission',
+            name='run_time_ms',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Орындау уақыты (мс)'),
+        ),
+        migrations.AlterField(
+            model_name='gradingjob',
+            name='kind',
+            field=models.CharField(choices=[('speaking', 'Айтылым'), ('writing', 'Жазылым')], default='speaking', max_length=16, verbose_name='Түрі'),
+        ),
+    ]
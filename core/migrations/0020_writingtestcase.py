@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-16 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_writingsubmission_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='writing',
+            name='scoring_mode',
+            field=models.CharField(choices=[('all_or_nothing', 'Барлық тест өтуі керек'), ('partial', 'Өткен тест салмағына қарай')], default='all_or_nothing', max_length=32, verbose_name='Бағалау режимі'),
+        ),
+        migrations.AddField(
+            model_name='writingsubmission',
+            name='case_results',
+            field=models.JSONField(blank=True, default=list, verbose_name='Тест нәтижелері'),
+        ),
+        migrations.AlterField(
+            model_name='writing',
+            name='expected_output',
+            field=models.TextField(blank=True, verbose_name='Дұрыс шығару (output)'),
+        ),
+        migrations.CreateModel(
+            name='WritingTestCase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stdin', models.TextField(blank=True, default='', verbose_name='Енгізу')),
+                ('expected_output', models.TextField(verbose_name='Шығу')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='Салмағы')),
+                ('order', models.PositiveSmallIntegerField(default=1, verbose_name='Реттілік')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_cases', to='core.question', verbose_name='Сұрақ')),
+            ],
+            options={
+                'verbose_name': 'Тест жағдайы',
+                'verbose_name_plural': 'Тест жағдайлары',
+                'ordering': ['order', 'id'],
+            },
+        ),
+    ]
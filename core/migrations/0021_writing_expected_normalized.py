@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-16 12:05
+
+from django.db import migrations, models
+from core.utils.output import normalize_output
+
+
+def fill_expected_normalized(apps, schema_editor):
+    for model_name in ("Writing", "WritingTestCase"):
+        model = apps.get_model("core", model_name)
+        rows = list(model.objects.only("id", "expected_output"))
+        for row in rows:
+            row.expected_normalized = normalize_output(row.expected_output)
+        model.objects.bulk_update(rows, ["expected_normalized"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_writingtestcase'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='writing',
+            name='expected_normalized',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='writing',
+            name='float_tolerance',
+            field=models.FloatField(blank=True, help_text='Бөлшек сандарды осы дәлдікпен салыстыру (мысалы 1e-6).', null=True, verbose_name='Сандық дәлдік'),
+        ),
+        migrations.AddField(
+            model_name='writingtestcase',
+            name='expected_normalized',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_expected_normalized, migrations.RunPython.noop),
+    ]
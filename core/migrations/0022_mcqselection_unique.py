@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-16 13:40
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_selections(apps, schema_editor):
+    MCQSelection = apps.get_model("core", "MCQSelection")
+    duplicates = (
+        MCQSelection.objects
+        .values("question_attempt_id", "option_id")
+        .annotate(keep_id=Min("id"), n=Count("id"))
+        .filter(n__gt=1)
+    )
+    for row in duplicates:
+        (
+            MCQSelection.objects
+            .filter(question_attempt_id=row["question_attempt_id"], option_id=row["option_id"])
+            .exclude(pk=row["keep_id"])
+            .delete()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_writing_expected_normalized'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_selections, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='mcqselection',
+            constraint=models.UniqueConstraint(fields=('question_attempt', 'option'), name='uniq_option_per_question_attempt'),
+        ),
+    ]
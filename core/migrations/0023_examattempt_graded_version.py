@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-16 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_mcqselection_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examattempt',
+            name='graded_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Бағалау нұсқасы'),
+        ),
+    ]
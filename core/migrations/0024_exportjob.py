@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-16 23:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_examattempt_graded_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fmt', models.CharField(choices=[('xlsx', 'Excel (xlsx)'), ('csv', 'CSV')], default='xlsx', max_length=8, verbose_name='Формат')),
+                ('filters', models.JSONField(blank=True, default=dict, verbose_name='Сүзгілер')),
+                ('filters_hash', models.CharField(editable=False, max_length=64, verbose_name='Сүзгілер хэші')),
+                ('status', models.CharField(choices=[('pending', 'Кезекте'), ('running', 'Орындалуда'), ('done', 'Орындалды'), ('failed', 'Қате')], default='pending', max_length=16, verbose_name='Статус')),
+                ('total_rows', models.PositiveIntegerField(default=0, verbose_name='Барлық жол')),
+                ('done_rows', models.PositiveIntegerField(default=0, verbose_name='Дайын жол')),
+                ('file', models.FileField(blank=True, null=True, upload_to='exports/', verbose_name='Файл')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Алынған уақыты')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Аяқталған уақыты')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Соңғы қате')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Құрылған уақыты')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Жаңартылған уақыты')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Сұраған қолданушы')),
+            ],
+            options={
+                'verbose_name': 'Экспорт тапсырмасы',
+                'verbose_name_plural': 'Экспорт тапсырмалары',
+                'indexes': [models.Index(fields=['filters_hash', 'fmt', 'status'], name='export_job_reuse_idx'), models.Index(fields=['status', 'created_at'], name='export_job_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 6.0.1 on 2026-10-16 23:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examattempt',
+            name='stats_snapshot',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Статистика үлесі'),
+        ),
+        migrations.CreateModel(
+            name='DailyScoreStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section_type', models.CharField(default='total', max_length=32, verbose_name='Секция түрі')),
+                ('attempts_count', models.PositiveIntegerField(default=0, verbose_name='Нәтиже саны')),
+                ('percent_sum', models.FloatField(default=0, verbose_name='Пайыздар қосындысы')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Жаңартылған уақыты')),
+                ('day', models.DateField(verbose_name='Күні')),
+            ],
+            options={
+                'verbose_name': 'Күндік статистика',
+                'verbose_name_plural': 'Күндік статистика',
+                'constraints': [models.UniqueConstraint(fields=('day', 'section_type'), name='uniq_daily_score_stat')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExamScoreStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section_type', models.CharField(default='total', max_length=32, verbose_name='Секция түрі')),
+                ('attempts_count', models.PositiveIntegerField(default=0, verbose_name='Нәтиже саны')),
+                ('percent_sum', models.FloatField(default=0, verbose_name='Пайыздар қосындысы')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Жаңартылған уақыты')),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_stats', to='core.exam', verbose_name='Емтихан')),
+            ],
+            options={
+                'verbose_name': 'Емтихан статистикасы',
+                'verbose_name_plural': 'Емтихан статистикасы',
+                'constraints': [models.UniqueConstraint(fields=('exam', 'section_type'), name='uniq_exam_score_stat')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserScoreStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section_type', models.CharField(default='total', max_length=32, verbose_name='Секция түрі')),
+                ('attempts_count', models.PositiveIntegerField(default=0, verbose_name='Нәтиже саны')),
+                ('percent_sum', models.FloatField(default=0, verbose_name='Пайыздар қосындысы')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Жаңартылған уақыты')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_stats', to=settings.AUTH_USER_MODEL, verbose_name='Пайдаланушы')),
+            ],
+            options={
+                'verbose_name': 'Пайдаланушы статистикасы',
+                'verbose_name_plural': 'Пайдаланушы статистикасы',
+                'constraints': [models.UniqueConstraint(fields=('user', 'section_type'), name='uniq_user_score_stat')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_search_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='writing',
+            name='requires_code',
+            field=models.BooleanField(default=False, help_text='Жауап тек жіберілген кодты орындау арқылы бағаланады, қолмен енгізілген output қабылданбайды.', verbose_name='Код талап етіледі'),
+        ),
+        migrations.AddField(
+            model_name='writingtestcase',
+            name='is_hidden',
+            field=models.BooleanField(default=True, help_text='Жасырын тест бойынша бағдарлама шығысы оқушыға көрсетілмейді.', verbose_name='Жасырын'),
+        ),
+    ]
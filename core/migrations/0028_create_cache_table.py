@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-17 10:40
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+# CACHES әдепкіде DatabaseCache: кэш кестесі migrate кезінде құрылады (бар болса, ештеңе өзгермейді)
+def create_cache_table(apps, schema_editor):
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_writing_requires_code_writingtestcase_is_hidden'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
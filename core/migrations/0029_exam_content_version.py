@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_create_cache_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='content_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:50
+
+from django.db import migrations
+from core.utils.stemming import stem_phrase
+
+
+# stem_token ережелері өзгерді: сақталған кілт сөз түбірлері қайта есептеледі
+def recompute_keyword_stems(apps, schema_editor):
+    SpeakingRubric = apps.get_model("core", "SpeakingRubric")
+    changed = []
+    for rubric in SpeakingRubric.objects.only("id", "keywords", "keyword_stems"):
+        stems = [stem_phrase(k) for k in (rubric.keywords or []) if isinstance(k, str)]
+        if stems != rubric.keyword_stems:
+            rubric.keyword_stems = stems
+            changed.append(rubric)
+    SpeakingRubric.objects.bulk_update(changed, ["keyword_stems"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_exam_content_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_keyword_stems, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
 from .accounts import User
 from .exams import *
-from .attempts import *
\ No newline at end of file
+from .attempts import *
+from .jobs import *
+from .stats import *
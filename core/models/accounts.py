@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.utils.translation import gettext_lazy as _
 
 
@@ -20,3 +22,9 @@ class User(AbstractUser):
     class Meta:
         verbose_name = _("Қолданушы")
         verbose_name_plural = _("Қолданушылар")
+        # менеджер іздеуі (icontains → UPPER(...) LIKE) үшін pg_trgm индекстері
+        indexes = [
+            GinIndex(OpClass(Upper("username"), name="gin_trgm_ops"), name="user_username_trgm_idx"),
+            GinIndex(OpClass(Upper("first_name"), name="gin_trgm_ops"), name="user_first_name_trgm_idx"),
+            GinIndex(OpClass(Upper("last_name"), name="gin_trgm_ops"), name="user_last_name_trgm_idx"),
+        ]
@@ -31,6 +31,9 @@ class ExamAttempt(models.Model):
     total_score = models.DecimalField(_("Жалпы балл"), max_digits=7, decimal_places=2, default=0)
     max_total_score = models.DecimalField(_("Макс жалпы балл"), max_digits=7, decimal_places=2, default=0)
     meta = models.JSONField(_("Қосымша дерек"), default=dict, blank=True)
+    graded_version = models.PositiveIntegerField(_("Бағалау нұсқасы"), default=0, editable=False)
+    # статистика кестелеріне қосылған үлес (қайта бағалауда айырма ғана қолданылады)
+    stats_snapshot = models.JSONField(_("Статистика үлесі"), default=dict, blank=True, editable=False)
 
     class Meta:
         verbose_name = _("Емтихан нәтижесі")
@@ -122,6 +125,7 @@ class SpeakingAnswer(models.Model):
         related_name="speaking_answer", verbose_name=_("Сұрақ нәтижесі"),
     )
     audio = models.FileField(_("Аудио жауап"), upload_to="exams/speaking/", blank=True, null=True)
+    audio_sha256 = models.CharField(_("Аудио хэші"), max_length=64, blank=True, default="", db_index=True)
     transcript = models.TextField(_("Транскрипт"), blank=True, null=True)
     matched_count = models.PositiveSmallIntegerField(_("Табылған сөз саны"), default=0)
     matched_keywords = models.JSONField(_("Табылған кілт сөздер"), default=list, blank=True)
@@ -134,6 +138,27 @@ class SpeakingAnswer(models.Model):
         return _('#{}-айтылым жауабы').format(self.pk)
 
 
+# SpeakingTranscript
+class SpeakingTranscript(models.Model):
+    content_hash = models.CharField(_("Аудио хэші"), max_length=64)
+    model_name = models.CharField(_("Модель"), max_length=128)
+    transcript = models.TextField(_("Транскрипт"), blank=True, default="")
+    created_at = models.DateTimeField(_("Құрылған уақыты"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Транскрипт кэші")
+        verbose_name_plural = _("Транскрипт кэштері")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_hash", "model_name"],
+                name="uniq_transcript_per_hash_model",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.model_name}:{self.content_hash[:12]}"
+
+
 # MCQSelection
 class MCQSelection(models.Model):
     question_attempt = models.ForeignKey(
@@ -148,6 +173,12 @@ class MCQSelection(models.Model):
     class Meta:
         verbose_name = _("Тест жауабы")
         verbose_name_plural = _("Тест жауаптары")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["question_attempt", "option"],
+                name="uniq_option_per_question_attempt",
+            )
+        ]
 
     def __str__(self):
         return _('#{}-тест жауабы').format(self.pk)
@@ -169,6 +200,10 @@ class WritingSubmission(models.Model):
     code = models.TextField(_("Код"), blank=True, null=True)
     output_text = models.TextField(_("Жауап (output)"), blank=True, null=True)
     is_correct = models.BooleanField(_("Дұрыс"), default=False)
+    run_status = models.CharField(_("Орындау статусы"), max_length=32, blank=True, default="")
+    run_output = models.TextField(_("Бағдарлама шығысы"), blank=True, default="")
+    run_time_ms = models.PositiveIntegerField(_("Орындау уақыты (мс)"), blank=True, null=True)
+    case_results = models.JSONField(_("Тест нәтижелері"), blank=True, default=list)
     checked_at = models.DateTimeField(_("Тексерілген уақыты"), blank=True, null=True)
 
     class Meta:
@@ -1,6 +1,10 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
+from core.utils.output import normalize_output
+from core.utils.stemming import stem_phrase
 
 
 # ======================================================================================================================
@@ -12,14 +16,28 @@ class Exam(models.Model):
     description = models.TextField(_("Анықтама"), blank=True, null=True)
     is_published = models.BooleanField(_("Ашық емтихан"), default=True)
     created_at = models.DateTimeField(_("Жасалған уақыты"), auto_now_add=True)
+    # мазмұн (секция/материал/сұрақ/нұсқа) өзгерген сайын signals арқылы өседі; кэш кілттеріне кіреді
+    content_version = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = _("Емтихан")
         verbose_name_plural = _("Емтихандар")
+        indexes = [
+            GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="exam_title_trgm_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # content_version тек F() арқылы өседі: форманы сақтау оны ескі мәнге қайтармауы керек
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != "content_version"
+            ]
+        super().save(*args, **kwargs)
+
 
 # Section
 # ======================================================================================================================
@@ -181,6 +199,8 @@ class SpeakingRubric(models.Model):
         related_name="speaking_rubric", verbose_name=_("Сұрақ"),
     )
     keywords = models.JSONField(_("Кілттік сөздер"), default=list, blank=True)
+    keyword_stems = models.JSONField(_("Кілттік сөз түбірлері"), default=list, blank=True, editable=False)
+    use_stemming = models.BooleanField(_("Сөз формаларын ескеру"), default=False)
     point_per_keyword = models.PositiveSmallIntegerField(_("Әр сөзге балл"), default=3)
     max_points = models.PositiveSmallIntegerField(_("Максимум балл"), default=25)
 
@@ -220,6 +240,13 @@ class SpeakingRubric(models.Model):
 
         self.keywords = cleaned
 
+    def save(self, *args, **kwargs):
+        self.keyword_stems = [stem_phrase(k) for k in (self.keywords or []) if isinstance(k, str)]
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "keywords" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "keyword_stems"}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return _('#{}-рубрика').format(self.pk)
 
@@ -227,16 +254,72 @@ class SpeakingRubric(models.Model):
 # Writing
 # ======================================================================================================================
 class Writing(models.Model):
+    class ScoringMode(models.TextChoices):
+        ALL_OR_NOTHING = "all_or_nothing", _("Барлық тест өтуі керек")
+        PARTIAL = "partial", _("Өткен тест салмағына қарай")
+
     question = models.OneToOneField(
         Question, on_delete=models.CASCADE,
         related_name="writing", verbose_name=_("Сұрақ")
     )
-    expected_output = models.TextField(_("Дұрыс шығару (output)"))
+    expected_output = models.TextField(_("Дұрыс шығару (output)"), blank=True)
     ignore_whitespace = models.BooleanField(_("Whitespace елемеу"), default=True)
+    expected_normalized = models.TextField(blank=True, default="", editable=False)
+    scoring_mode = models.CharField(
+        _("Бағалау режимі"), max_length=32,
+        choices=ScoringMode.choices, default=ScoringMode.ALL_OR_NOTHING,
+    )
+    float_tolerance = models.FloatField(
+        _("Сандық дәлдік"), blank=True, null=True,
+        help_text=_("Бөлшек сандарды осы дәлдікпен салыстыру (мысалы 1e-6)."),
+    )
+    requires_code = models.BooleanField(
+        _("Код талап етіледі"), default=False,
+        help_text=_("Жауап тек жіберілген кодты орындау арқылы бағаланады, қолмен енгізілген output қабылданбайды."),
+    )
 
     class Meta:
         verbose_name = _("Жазбаша есеп")
         verbose_name_plural = _("Жазбаша есептер")
 
+    def save(self, *args, **kwargs):
+        self.expected_normalized = normalize_output(self.expected_output)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "expected_output" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "expected_normalized"}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return _('#{}-жазбаша есеп').format(self.pk)
+
+
+# WritingTestCase
+class WritingTestCase(models.Model):
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE,
+        related_name="test_cases", verbose_name=_("Сұрақ")
+    )
+    stdin = models.TextField(_("Енгізу"), blank=True, default="")
+    expected_output = models.TextField(_("Шығу"))
+    expected_normalized = models.TextField(blank=True, default="", editable=False)
+    weight = models.PositiveIntegerField(_("Салмағы"), default=1)
+    order = models.PositiveSmallIntegerField(_("Реттілік"), default=1)
+    is_hidden = models.BooleanField(
+        _("Жасырын"), default=True,
+        help_text=_("Жасырын тест бойынша бағдарлама шығысы оқушыға көрсетілмейді."),
+    )
+
+    class Meta:
+        verbose_name = _("Тест жағдайы")
+        verbose_name_plural = _("Тест жағдайлары")
+        ordering = ["order", "id"]
+
+    def save(self, *args, **kwargs):
+        self.expected_normalized = normalize_output(self.expected_output)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "expected_output" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "expected_normalized"}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return _('#{}-тест жағдайы').format(self.pk)
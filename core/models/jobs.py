@@ -0,0 +1,91 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+# ======================================================================================================================
+# Background jobs (DB-backed queue)
+# ======================================================================================================================
+# JobStatus
+class JobStatus(models.TextChoices):
+    PENDING = "pending", "Кезекте"
+    RUNNING = "running", "Орындалуда"
+    DONE = "done", "Орындалды"
+    FAILED = "failed", "Қате"
+
+
+# GradingJob
+class GradingJob(models.Model):
+    class Kind(models.TextChoices):
+        SPEAKING = "speaking", _("Айтылым")
+        WRITING = "writing", _("Жазылым")
+
+    question_attempt = models.ForeignKey(
+        "QuestionAttempt", on_delete=models.CASCADE,
+        related_name="grading_jobs", verbose_name=_("Сұрақ нәтижесі"),
+    )
+    kind = models.CharField(_("Түрі"), max_length=16, choices=Kind.choices, default=Kind.SPEAKING)
+    status = models.CharField(_("Статус"), max_length=16, choices=JobStatus.choices, default=JobStatus.PENDING)
+    attempts = models.PositiveSmallIntegerField(_("Әрекет саны"), default=0)
+    run_after = models.DateTimeField(_("Орындау уақыты"), default=timezone.now)
+    locked_at = models.DateTimeField(_("Алынған уақыты"), blank=True, null=True)
+    last_error = models.TextField(_("Соңғы қате"), blank=True, default="")
+    created_at = models.DateTimeField(_("Құрылған уақыты"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Жаңартылған уақыты"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Бағалау тапсырмасы")
+        verbose_name_plural = _("Бағалау тапсырмалары")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["question_attempt", "kind"],
+                name="uniq_grading_job_per_question_attempt",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="grading_job_queue_idx"),
+        ]
+
+    def __str__(self):
+        return _('#{}-бағалау тапсырмасы').format(self.pk)
+
+
+# ExportJob
+class ExportJob(models.Model):
+    class Format(models.TextChoices):
+        XLSX = "xlsx", "Excel (xlsx)"
+        CSV = "csv", "CSV"
+
+    requested_by = models.ForeignKey(
+        "User", on_delete=models.SET_NULL, null=True, blank=True,
+        related_name="export_jobs", verbose_name=_("Сұраған қолданушы"),
+    )
+    fmt = models.CharField(_("Формат"), max_length=8, choices=Format.choices, default=Format.XLSX)
+    filters = models.JSONField(_("Сүзгілер"), default=dict, blank=True)
+    filters_hash = models.CharField(_("Сүзгілер хэші"), max_length=64, editable=False)
+    status = models.CharField(_("Статус"), max_length=16, choices=JobStatus.choices, default=JobStatus.PENDING)
+    total_rows = models.PositiveIntegerField(_("Барлық жол"), default=0)
+    done_rows = models.PositiveIntegerField(_("Дайын жол"), default=0)
+    file = models.FileField(_("Файл"), upload_to="exports/", blank=True, null=True)
+    locked_at = models.DateTimeField(_("Алынған уақыты"), blank=True, null=True)
+    finished_at = models.DateTimeField(_("Аяқталған уақыты"), blank=True, null=True)
+    last_error = models.TextField(_("Соңғы қате"), blank=True, default="")
+    created_at = models.DateTimeField(_("Құрылған уақыты"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Жаңартылған уақыты"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Экспорт тапсырмасы")
+        verbose_name_plural = _("Экспорт тапсырмалары")
+        indexes = [
+            models.Index(fields=["filters_hash", "fmt", "status"], name="export_job_reuse_idx"),
+            models.Index(fields=["status", "created_at"], name="export_job_queue_idx"),
+        ]
+
+    def __str__(self):
+        return _('#{}-экспорт').format(self.pk)
+
+    @property
+    def percent(self) -> int:
+        if not self.total_rows:
+            return 100 if self.status == JobStatus.DONE else 0
+        return min(100, self.done_rows * 100 // self.total_rows)
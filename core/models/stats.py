@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+# ======================================================================================================================
+# Score statistics (аяқталған attempt-тер бойынша алдын ала жинақталған қосындылар)
+# ======================================================================================================================
+# section_type = "total" — жалпы балл, қалғаны Section.SectionType мәндері
+STAT_TOTAL = "total"
+
+
+# ScoreStatBase
+class ScoreStatBase(models.Model):
+    section_type = models.CharField(_("Секция түрі"), max_length=32, default=STAT_TOTAL)
+    attempts_count = models.PositiveIntegerField(_("Нәтиже саны"), default=0)
+    percent_sum = models.FloatField(_("Пайыздар қосындысы"), default=0)
+    updated_at = models.DateTimeField(_("Жаңартылған уақыты"), auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def avg(self) -> float | None:
+        if not self.attempts_count:
+            return None
+        return self.percent_sum / self.attempts_count
+
+
+# ExamScoreStat
+class ExamScoreStat(ScoreStatBase):
+    exam = models.ForeignKey(
+        "Exam", on_delete=models.CASCADE,
+        related_name="score_stats", verbose_name=_("Емтихан"),
+    )
+
+    class Meta:
+        verbose_name = _("Емтихан статистикасы")
+        verbose_name_plural = _("Емтихан статистикасы")
+        constraints = [
+            models.UniqueConstraint(fields=["exam", "section_type"], name="uniq_exam_score_stat"),
+        ]
+
+
+# UserScoreStat
+class UserScoreStat(ScoreStatBase):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name="score_stats", verbose_name=_("Пайдаланушы"),
+    )
+
+    class Meta:
+        verbose_name = _("Пайдаланушы статистикасы")
+        verbose_name_plural = _("Пайдаланушы статистикасы")
+        constraints = [
+            models.UniqueConstraint(fields=["user", "section_type"], name="uniq_user_score_stat"),
+        ]
+
+
+# DailyScoreStat
+class DailyScoreStat(ScoreStatBase):
+    day = models.DateField(_("Күні"))
+
+    class Meta:
+        verbose_name = _("Күндік статистика")
+        verbose_name_plural = _("Күндік статистика")
+        constraints = [
+            models.UniqueConstraint(fields=["day", "section_type"], name="uniq_daily_score_stat"),
+        ]
@@ -0,0 +1,69 @@
+import math
+import re
+from itertools import zip_longest
+
+
+# Бағдарлама шығысын салыстыру: жолдар ретімен, әр жолдағы бос орындар бір бос орынға теңестіріледі,
+# басындағы/соңындағы бос жолдар ескерілмейді
+_NEWLINE_RE = re.compile(r"\r\n|\r|\n")
+
+
+def _iter_lines(s: str):
+    pos = 0
+    for m in _NEWLINE_RE.finditer(s):
+        yield s[pos:m.start()]
+        pos = m.end()
+    yield s[pos:]
+
+
+# әр жол үшін токендер тізімін жалқау (lazy) түрде береді
+def iter_output_tokens(s: str):
+    blanks = 0
+    started = False
+    for line in _iter_lines(s or ""):
+        tokens = line.split()
+        if not tokens:
+            if started:
+                blanks += 1
+            continue
+        for _ in range(blanks):
+            yield []
+        blanks = 0
+        started = True
+        yield tokens
+
+
+# normalize_output нәтижесі үшін: жолдар жаңа жол таңбасымен, токендер бір бос орынмен бөлінген
+def iter_normalized_tokens(s: str):
+    if not s:
+        return
+    for line in _iter_lines(s):
+        yield line.split(" ") if line else []
+
+
+def normalize_output(s: str) -> str:
+    return "\n".join(" ".join(tokens) for tokens in iter_output_tokens(s))
+
+
+def _tokens_equal(a: str, b: str, tolerance: float | None) -> bool:
+    if a == b:
+        return True
+    if tolerance is None:
+        return False
+    try:
+        x, y = float(a), float(b)
+    except ValueError:
+        return False
+    return math.isclose(x, y, rel_tol=tolerance, abs_tol=tolerance)
+
+
+# outputs_match: бірінші сәйкессіздікте тоқтайды
+def outputs_match(actual: str, expected_normalized: str, tolerance: float | None = None) -> bool:
+    for got, want in zip_longest(iter_output_tokens(actual), iter_normalized_tokens(expected_normalized)):
+        if got is None or want is None or len(got) != len(want):
+            return False
+        if got == want:
+            continue
+        if not all(_tokens_equal(a, b, tolerance) for a, b in zip(got, want)):
+            return False
+    return True
@@ -0,0 +1,86 @@
+import re
+from functools import lru_cache
+
+
+# Қазақ/орыс тілдеріне арналған жеңіл суффикс кесуші (сөздіксіз).
+# Кілт сөз бен транскриптке бірдей қолданылады, сондықтан "желілер" мен "желі" бір түбірге түседі.
+# Әр қабаттан ең көбі бір жалғау кесіледі: қазақшада септік → тәуелдік → көптік (сөзде керісінше ретпен тұрады),
+# соңынан көптіктен кейін қалған дәнекер -і/-ы (объекті-лер) мен тұйық етіс -у; орысшада бір ғана флексия.
+# Қысқа түбірлер бір-бірімен соқтығыспауы үшін (желі/жел, кесу/кес) бір дауыстыдан тұратын жалғау
+# түбірді минимал ұзындықта қалдыратын болса кесілмейді.
+KK_CASE_SUFFIXES = (
+    "ның", "нің", "дың", "дің", "тың", "тің",
+    "ға", "ге", "қа", "ке", "на", "не",
+    "ны", "ні", "ды", "ді", "ты", "ті",
+    "нда", "нде", "да", "де", "та", "те",
+    "нан", "нен", "дан", "ден", "тан", "тен",
+    "мен", "бен", "пен",
+)
+KK_POSSESSIVE_SUFFIXES = (
+    "ымыз", "іміз", "мыз", "міз", "ыңыз", "іңіз",
+    "ым", "ім", "ың", "ің", "сы", "сі", "ы", "і",
+)
+KK_PLURAL_SUFFIXES = ("лар", "лер", "дар", "дер", "тар", "тер")
+KK_TAIL_SUFFIXES = ("і", "ы", "у")
+RU_SUFFIXES = (
+    "ами", "ями", "ого", "его", "ому", "ему", "ыми", "ими",
+    "ых", "их", "ой", "ей", "ий", "ый", "ая", "яя", "ое", "ее", "ые", "ие", "ую", "юю",
+    "ом", "ем", "ам", "ям", "ах", "ях", "ов", "ев", "ью", "ья", "ье", "ия", "ию",
+    "ы", "и", "а", "я", "о", "е", "у", "ю", "ь",
+)
+
+
+def _longest_first(suffixes) -> tuple[str, ...]:
+    return tuple(sorted(set(suffixes), key=len, reverse=True))
+
+
+KK_LAYERS = tuple(_longest_first(layer) for layer in (
+    KK_CASE_SUFFIXES, KK_POSSESSIVE_SUFFIXES, KK_PLURAL_SUFFIXES, KK_TAIL_SUFFIXES,
+))
+RU_ENDINGS = _longest_first(RU_SUFFIXES)
+KK_LETTERS = frozenset("әғқңөұүһі")
+VOWELS = frozenset("аәеёиоөуұүыіэюя")
+# орысша атау септігі осы дауыстыға бітеді (база, окно), ал -и/-ы/-у/-ю/-ь кесілетін флексия (сети → сеть)
+RU_LEMMA_VOWELS = frozenset("аяое")
+MIN_STEM_LENGTH = 3
+
+_TOKEN_RE = re.compile(r"\w+", flags=re.UNICODE)
+
+
+def _strip_layer(word: str, suffixes: tuple[str, ...], kazakh: bool) -> tuple[str, bool]:
+    """Бір жалғауды кеседі; екінші мән жалғау табылды ма (кесілді не қорғалды)."""
+    for suffix in suffixes:
+        if not word.endswith(suffix):
+            continue
+        rest = len(word) - len(suffix)
+        # т-дан басталатын қазақ жалғауы дауыстыдан кейін келмейді (компьютер ≠ компью + тер)
+        if kazakh and suffix[0] == "т" and word[rest - 1] in VOWELS:
+            continue
+        if rest < MIN_STEM_LENGTH:
+            continue
+        # бір дауыстыдан тұратын жалғау түбірді минимал ұзындықта қалдырса, бұл көбіне түбірдің өз әрпі (желі, кесу)
+        guarded = (
+            rest == MIN_STEM_LENGTH and len(suffix) == 1
+            and (suffix in VOWELS if kazakh else suffix in RU_LEMMA_VOWELS)
+        )
+        return (word, True) if guarded else (word[:-len(suffix)], True)
+    return word, False
+
+
+@lru_cache(maxsize=65536)
+def stem_token(token: str) -> str:
+    word = token.lower()
+    stem = word
+    kazakh_matched = False
+    for suffixes in KK_LAYERS:
+        stem, matched = _strip_layer(stem, suffixes, kazakh=True)
+        kazakh_matched = kazakh_matched or matched
+    # қазақ жалғауы табылмаған, қазақ әрпі жоқ сөз орысша болуы мүмкін: бір флексия кесіледі
+    if not kazakh_matched and not KK_LETTERS.intersection(word):
+        stem, _ = _strip_layer(stem, RU_ENDINGS, kazakh=False)
+    # жалғаудан босаған негіз жеке сөз сияқты қайта өңделеді: stem("кестеде") == stem("кесте")
+    return stem if stem == word else stem_token(stem)
+
+
+def stem_phrase(text: str) -> str:
+    return " ".join(stem_token(t) for t in _TOKEN_RE.findall((text or "").lower()))